@@ -0,0 +1,25 @@
+"""
+Helpers shared by the AI advisor modules.
+"""
+
+import re
+from typing import List
+
+# Tail of an answer following its sources header (English or Polish)
+_SOURCES_RE = re.compile(r"(?:Sources:|Źródła:)\s*(.+)\Z", re.DOTALL)
+
+
+def extract_sources(answer: str) -> List[str]:
+    """
+    Extract the non-empty lines listed after a "Sources:" / "Źródła:" header.
+
+    Args:
+        answer: AI-generated answer
+
+    Returns:
+        List of sources
+    """
+    match = _SOURCES_RE.search(answer)
+    if not match:
+        return []
+    return [line for line in map(str.strip, match.group(1).splitlines()) if line]
@@ -0,0 +1,41 @@
+"""
+Numeric kernels for risk assessment.
+
+The functions here are plain Python so they can be compiled ahead of time
+with Numba. Running this module builds the ``ai.risk_kernels`` extension next
+to it (do it at image/wheel build time):
+
+    python -m ai._risk_kernels
+
+risk_assessment imports the compiled extension when it exists. Otherwise it
+JIT-compiles these functions with explicit signatures and an on-disk cache,
+or falls back to NumPy when numba is not installed.
+"""
+
+import numpy as np
+
+# Explicit signatures shared by the AOT export and the JIT fallback
+WELFORD_CV_SIGNATURE = "f8(f8[::1])"
+
+
+def welford_cv(arr: np.ndarray) -> float:
+    """Coefficient of variation via Welford's single-pass, numerically stable variance."""
+    mean = 0.0
+    m2 = 0.0
+    for i in range(arr.shape[0]):
+        delta = arr[i] - mean
+        mean += delta / (i + 1)
+        m2 += (arr[i] - mean) * delta
+    if mean <= 0:
+        return np.inf
+    return (m2 / arr.shape[0]) ** 0.5 / mean
+
+
+if __name__ == "__main__":
+    import os
+    from numba.pycc import CC
+
+    cc = CC("risk_kernels")
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+    cc.export("welford_cv", WELFORD_CV_SIGNATURE)(welford_cv)
+    cc.compile()
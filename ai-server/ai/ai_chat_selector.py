@@ -1,18 +1,226 @@
 # ai/ai_chat_selector.py
+import os
 import time
+import queue
 import logging
-import json
+import threading
+from functools import partial
+from datetime import datetime
+import orjson
 from typing import Dict, Any, List, Optional
-from ai.tree_model import TreeModel
-from ai.financial_advisor import FinancialLegalAdvisor
-from ai.investment_advisor import InvestmentAdvisor
-from ai.user_profile_form import UserProfileForm
 from core.financial_models import AdvisoryRequest, AdvisoryResponse
-import psycopg2
-from core.database import get_db_connection
+import redis
+from psycopg2.extras import execute_values
+from cachetools import TTLCache
+try:
+    import ahocorasick
+except ImportError:  # fall back to bytes scanning without pyahocorasick
+    ahocorasick = None
+from core.database import get_db_cursor, get_thread_db_cursor, execute_prepared
 
 logger = logging.getLogger(__name__)
 
+# Redis cache for decoded user_profiles rows (write-through invalidation on save)
+PROFILE_CACHE_TTL = 3600
+
+# Bounds for in-process form state; idle users are evicted after the TTL
+USER_FORMS_MAX_SIZE = 10000
+USER_FORMS_TTL = 3600
+
+# Chat/decision interaction rows are buffered and flushed in batches
+INTERACTION_FLUSH_SIZE = 100
+INTERACTION_FLUSH_INTERVAL = 0.25  # seconds
+# Rows kept for retry while the database is failing; the oldest beyond this are dropped
+INTERACTION_BUFFER_MAX = 10 * INTERACTION_FLUSH_SIZE
+_redis = redis.Redis(connection_pool=redis.ConnectionPool.from_url(
+    os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+    socket_timeout=0.05,
+    socket_connect_timeout=0.05
+))
+
+# Polish diacritics folding; messages and keywords are matched in folded form
+_PL_FOLD = str.maketrans("ąćęłńóśźżĄĆĘŁŃÓŚŹŻ", "acelnoszzACELNOSZZ")
+
+def _normalize_message(message: str) -> str:
+    """Lowercase a message and fold Polish diacritics for keyword matching."""
+    return message.lower().translate(_PL_FOLD)
+
+# Advisor routing keywords, in priority order (earlier groups win when several match)
+ADVISOR_KEYWORDS = (
+    ("tax", ("podatek", "podatki", "pit", "vat", "cit", "zeznanie", "zwrot", "urząd skarbowy", "odliczenie")),
+    ("legal", ("prawo", "prawne", "umowa", "przepisy", "regulacje", "ustawa", "kodeks", "kontrakt")),
+    ("investment", ("inwestycja", "inwestowanie", "giełda", "akcje", "obligacje", "fundusz", "portfel", "etf", "dywidenda")),
+    ("financial", ("budżet", "oszczędności", "wydatki", "dochody", "kredyt", "pożyczka", "planowanie", "emerytura", "ubezpieczenie")),
+)
+
+# Decision tree triggers
+TREE_TRIGGERS = (
+    "pokaż opcje", "drzewo decyzyjne", "pomóż mi krok po kroku",
+    "potrzebuję wskazówek", "jakie mam możliwości",
+    "co proponujesz", "jakie są opcje", "co mogę zrobić", "pokaż możliwości"
+)
+
+# Implicit requests for guidance
+GUIDANCE_INDICATORS = (
+    "nie wiem co robić", "doradź mi", "co powinienem", "co powinnam",
+    "najlepsze opcje", "co byś radził", "powiedz mi co", "pomóż mi zdecydować"
+)
+
+# Behavioral profile values -> context descriptions
+DECISION_STYLE_DESCRIPTIONS = {
+    "analytical": "Preferencja dla danych, liczb i szczegółowych analiz.",
+    "intuitive": "Preferencja dla szerszego obrazu, metafor i przykładów.",
+    "consultative": "Preferencja dla różnych perspektyw i opinii ekspertów.",
+    "directive": "Preferencja dla konkretnych, bezpośrednich wskazówek."
+}
+RISK_TOLERANCE_DESCRIPTIONS = {
+    "conservative": "Bezpieczeństwo i stabilność są priorytetem.",
+    "moderate": "Zrównoważone podejście do ryzyka i zysku.",
+    "aggressive": "Akceptacja wyższego ryzyka dla wyższych potencjalnych zysków."
+}
+TIME_PREFERENCE_DESCRIPTIONS = {
+    "short_term": "Krótkoterminowe planowanie (do 1 roku).",
+    "medium_term": "Średnioterminowe planowanie (1-5 lat).",
+    "long_term": "Długoterminowe planowanie (powyżej 5 lat)."
+}
+
+# Risk tolerance phrasing used in the post-form greeting
+RISK_TOLERANCE_GREETINGS = {
+    "conservative": "ostrożne podejście do ryzyka",
+    "moderate": "zrównoważone podejście do ryzyka",
+    "aggressive": "otwartość na wyższe ryzyko dla potencjalnie wyższych zysków"
+}
+
+# Fixed user-facing replies
+_MSG_FORM_SKIPPED = "Formularz pominięty. W czym mogę Ci pomóc?"
+_MSG_NO_USER_ID = "Nie mogę rozpocząć formularza bez identyfikatora użytkownika."
+_MSG_TREE_DEFAULT = "Przejdźmy do bardziej strukturyzowanego podejścia z drzewem decyzyjnym. Jakiego rodzaju doradztwa potrzebujesz?"
+_MSG_TREE_INTRO = "Przejdźmy do bardziej strukturyzowanego podejścia. Zaraz przedstawię Ci kilka opcji, które pomogą mi lepiej zrozumieć Twoją sytuację i dostarczyć konkretne rekomendacje."
+_MSG_TREE_GUIDANCE = "Widzę, że szukasz konkretnych wskazówek. Najlepiej będzie, jeśli przeprowadzę Cię przez serię pytań, które pomogą mi lepiej zrozumieć Twoją sytuację. Czy chcesz przejść do takiego ustrukturyzowanego podejścia?"
+_MSG_TREE_TRANSITION = "Przejdźmy do bardziej strukturyzowanego podejścia, aby lepiej zrozumieć Twoje potrzeby i dostarczyć konkretne rekomendacje."
+_MSG_GENERIC_ERROR = "Przepraszam, wystąpił błąd podczas przetwarzania Twojej wiadomości. Spróbuj ponownie lub skontaktuj się z pomocą techniczną."
+_MSG_FORM_THANKS = "Dziękuję za wypełnienie formularza. "
+_MSG_GREETING_CLOSING = "W jaki sposób mogę Ci pomóc w osiągnięciu Twoich celów finansowych? Możemy omówić konkretne strategie, przejść przez drzewo decyzyjne, lub odpowiem na Twoje pytania."
+_MSG_GREETING_FALLBACK = "Witaj! Dziękuję za wypełnienie formularza. W czym mogę Ci pomóc?"
+_MSG_INITIAL_QUESTION = "Rozpoczęcie rozmowy po formularzu"
+
+# Server-side prepared statements for the per-message profile queries
+_SQL_LOAD_PROFILE = (
+    "SELECT financial_data, behavioral_profile, recommended_advisor FROM user_profiles WHERE user_id = $1"
+)
+_SQL_UPSERT_PROFILE = """
+    INSERT INTO user_profiles (user_id, financial_data, behavioral_profile, recommended_advisor, created_at, updated_at)
+    VALUES ($1, $2, $3, $4, NOW(), NOW())
+    ON CONFLICT (user_id) DO UPDATE SET
+        financial_data = EXCLUDED.financial_data,
+        behavioral_profile = EXCLUDED.behavioral_profile,
+        recommended_advisor = EXCLUDED.recommended_advisor,
+        updated_at = NOW()
+"""
+_SQL_UPDATE_ADVISOR = """
+    UPDATE user_profiles 
+    SET recommended_advisor = $1, updated_at = NOW()
+    WHERE user_id = $2
+"""
+
+# Commands (re)starting the profile form, in folded form
+FORM_START_COMMANDS = ("wypelnij formularz", "start formularz")
+
+# handle_message fast path for short messages from users with a known advisor
+FAST_PATH_ENABLED = True
+_MIN_COMMAND_PHRASE_LEN = min(len(phrase) for phrase in (*FORM_START_COMMANDS, *TREE_TRIGGERS, *GUIDANCE_INDICATORS))
+
+def _build_keyword_automaton(groups):
+    """
+    Compile (label, keywords) groups into a matcher mapping keyword -> (priority, label).
+    
+    Keywords are diacritic-folded, so they must be matched against _normalize_message output.
+    
+    Uses a pyahocorasick automaton when available, otherwise a tuple of
+    pre-encoded UTF-8 keyword groups scanned with bytes.__contains__.
+    """
+    groups = [
+        (label, tuple(dict.fromkeys(keyword.translate(_PL_FOLD) for keyword in keywords)))
+        for label, keywords in groups
+    ]
+    
+    if ahocorasick is None:
+        return tuple(
+            (label, tuple(keyword.encode("utf-8") for keyword in keywords))
+            for label, keywords in groups
+        )
+    
+    automaton = ahocorasick.Automaton()
+    for priority, (label, keywords) in enumerate(groups):
+        for keyword in keywords:
+            automaton.add_word(keyword, (priority, label))
+    automaton.make_automaton()
+    return automaton
+
+def _best_match(matcher, text: str) -> Optional[str]:
+    """Return the label of the highest-priority keyword found in text, or None."""
+    if isinstance(matcher, tuple):
+        # UTF-8 is self-synchronizing, so byte substring matches equal str matches
+        data = text.encode("utf-8")
+        for label, keywords in matcher:
+            if any(keyword in data for keyword in keywords):
+                return label
+        return None
+    
+    best = None
+    for _, (priority, label) in matcher.iter(text):
+        if priority == 0:
+            return label
+        if best is None or priority < best[0]:
+            best = (priority, label)
+    return best[1] if best else None
+
+# UserProfileForm class, imported on first use (advisors are injected by the caller)
+_user_profile_form_cls = None
+
+def _new_user_form():
+    """Create a fresh UserProfileForm, importing its module on first use."""
+    global _user_profile_form_cls
+    if _user_profile_form_cls is None:
+        from ai.user_profile_form import UserProfileForm
+        _user_profile_form_cls = UserProfileForm
+    return _user_profile_form_cls()
+
+# Native keyword matchers shared by all selectors
+_ADVISOR_MATCHER = _build_keyword_automaton(ADVISOR_KEYWORDS)
+_TREE_READINESS_MATCHER = _build_keyword_automaton((
+    ("trigger", TREE_TRIGGERS),
+    ("guidance", GUIDANCE_INDICATORS)
+))
+
+def _dumps(value: Any) -> str:
+    """Serialize a JSON blob for a jsonb parameter (psycopg2 expects str)."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def _profile_cache_key(user_id: int) -> str:
+    return f"user_profile:{user_id}"
+
+def _get_cached_profile(user_id: int) -> Optional[Dict[str, Any]]:
+    """Return the cached profile dict or None on miss/unavailable cache."""
+    try:
+        blob = _redis.get(_profile_cache_key(user_id))
+        return orjson.loads(blob) if blob else None
+    except Exception as e:
+        logger.debug(f"Profile cache read failed: {str(e)}")
+        return None
+
+def _set_cached_profile(user_id: int, profile: Dict[str, Any]) -> None:
+    try:
+        _redis.setex(_profile_cache_key(user_id), PROFILE_CACHE_TTL, _dumps(profile))
+    except Exception as e:
+        logger.debug(f"Profile cache write failed: {str(e)}")
+
+def _invalidate_cached_profile(user_id: int) -> None:
+    try:
+        _redis.delete(_profile_cache_key(user_id))
+    except Exception as e:
+        logger.debug(f"Profile cache invalidation failed: {str(e)}")
+
 class AIChatSelector:
     """Class to select appropriate AI models for handling different types of queries."""
     
@@ -21,7 +229,28 @@ class AIChatSelector:
         self.financial_advisor = financial_advisor
         self.investment_advisor = investment_advisor
         self.tree_model = tree_model
-        self.user_forms = {}  # Dictionary to store user forms by user_id
+        
+        # Advisor routing table: advisor_type -> advisor handling the request
+        self._advisor_dispatch = {
+            "investment": investment_advisor,
+            "tax": financial_advisor,
+            "legal": financial_advisor,
+            "financial": financial_advisor
+        }
+        self.user_forms = TTLCache(maxsize=USER_FORMS_MAX_SIZE, ttl=USER_FORMS_TTL)  # User forms by user_id
+        
+        # Keyword automatons for single-pass message scanning (compiled once per process)
+        self._advisor_ac = _ADVISOR_MATCHER
+        self._tree_ac = _TREE_READINESS_MATCHER
+        
+        # Background writer keeps DB round-trips off the reply path; its helpers
+        # use a connection pinned to the writer thread so prepared statements persist
+        self._write_q = queue.Queue()
+        self._buffer_lock = threading.Lock()
+        self._chat_buffer = []
+        self._decision_buffer = []
+        self._last_flush = time.monotonic()
+        threading.Thread(target=self._db_writer, name="ai-chat-db-writer", daemon=True).start()
         
         logger.info("AIChatSelector initialized")
     
@@ -41,9 +270,13 @@ class AIChatSelector:
             if context is None:
                 context = {}
             
+            message_norm = _normalize_message(message)
+            # Advisor already stored in the user's profile (not rewritten if unchanged)
+            stored_advisor = None
+            
             # Initialize user form if it doesn't exist
             if user_id is not None and user_id not in self.user_forms:
-                self.user_forms[user_id] = UserProfileForm()
+                self.user_forms[user_id] = _new_user_form()
                 
                 # Try to load existing profile from database
                 db_profile = self._load_profile_from_database(user_id)
@@ -51,13 +284,23 @@ class AIChatSelector:
                     logger.info(f"Loaded existing profile for user {user_id}")
                     self.user_forms[user_id].is_complete = True
                     context.update(db_profile)
+                    stored_advisor = db_profile.get("recommended_advisor")
+            elif (user_id is not None and "recommended_advisor" not in context
+                    and self.user_forms[user_id].is_form_complete()):
+                # Callers usually pass an empty context; take the advisor from the
+                # cached profile (Redis hit, no database roundtrip) without overriding theirs
+                db_profile = self._load_profile_from_database(user_id)
+                if db_profile:
+                    for key, value in db_profile.items():
+                        context.setdefault(key, value)
+                    stored_advisor = db_profile.get("recommended_advisor")
             
             # Handle form filling process
             if user_id is not None and not self.user_forms[user_id].is_form_complete():
                 # Handle administrative commands
-                if "pomiń formularz" in message.lower() or "pomin formularz" in message.lower():
+                if "pomin formularz" in message_norm:
                     self.user_forms[user_id].is_complete = True
-                    return "Formularz pominięty. W czym mogę Ci pomóc?"
+                    return _MSG_FORM_SKIPPED
                 
                 # Process the answer and get the next question
                 response = self.user_forms[user_id].process_answer(message)
@@ -68,22 +311,32 @@ class AIChatSelector:
                     context.update(profile_data)
                     
                     # Save profile to database
-                    self._save_profile_to_database(user_id, profile_data)
+                    self._enqueue_write(self._save_profile_to_database, user_id, profile_data)
                 
                 return response
             
-            # Handle form restart/start
-            if "wypełnij formularz" in message.lower() or "wypelnij formularz" in message.lower() or "start formularz" in message.lower():
-                if user_id is not None:
-                    self.user_forms[user_id] = UserProfileForm()
-                    return self.user_forms[user_id].get_next_question()
-                else:
-                    return "Nie mogę rozpocząć formularza bez identyfikatora użytkownika."
+            # Fast path: users with a completed form and known advisor sending messages
+            # too short to contain any form command or decision-tree phrase
+            fast_path = (
+                FAST_PATH_ENABLED
+                and user_id is not None
+                and context.get("recommended_advisor")
+                and len(message_norm) < _MIN_COMMAND_PHRASE_LEN
+            )
             
-            # Check if the message indicates readiness for decision tree
-            tree_transition = self.check_decision_tree_readiness(message, user_id, context)
-            if tree_transition.get("ready_for_tree", False):
-                return tree_transition.get("message", "Przejdźmy do bardziej strukturyzowanego podejścia z drzewem decyzyjnym. Jakiego rodzaju doradztwa potrzebujesz?")
+            if not fast_path:
+                # Handle form restart/start
+                if any(command in message_norm for command in FORM_START_COMMANDS):
+                    if user_id is not None:
+                        self.user_forms[user_id] = _new_user_form()
+                        return self.user_forms[user_id].get_next_question()
+                    else:
+                        return _MSG_NO_USER_ID
+                
+                # Check if the message indicates readiness for decision tree
+                tree_transition = self.check_decision_tree_readiness(message, user_id, context, message_norm)
+                if tree_transition.get("ready_for_tree", False):
+                    return tree_transition.get("message", _MSG_TREE_DEFAULT)
             
             # Check for an assigned advisor in the context
             advisor_type = None
@@ -94,7 +347,7 @@ class AIChatSelector:
             
             # If no assigned advisor, determine from the message
             if not advisor_type:
-                advisor_type = self._determine_advisor_from_message(message)
+                advisor_type = self._determine_advisor_from_message(message, message_norm)
                 
                 # Add determined advisor to context
                 if "behavioral_profile" not in context:
@@ -104,9 +357,16 @@ class AIChatSelector:
             # Enhance context with behavioral profile information
             self._enhance_context_with_behavioral_profile(context)
             
-            # Save determined advisor to database if user exists
-            if user_id is not None:
-                self._update_user_advisor(user_id, advisor_type)
+            # Save determined advisor to database if user exists; rewriting an unchanged
+            # advisor would only invalidate the cached profile
+            if user_id is not None and advisor_type != stored_advisor:
+                self._enqueue_write(self._update_user_advisor, user_id, advisor_type)
+            
+            # Route to appropriate advisor (financial for undefined types)
+            advisor = self._advisor_dispatch.get(advisor_type)
+            if advisor is None:
+                advisor_type = "financial"
+                advisor = self.financial_advisor
             
             # Create advisory request
             request = AdvisoryRequest(
@@ -117,53 +377,100 @@ class AIChatSelector:
                 language="pl"
             )
             
-            # Route to appropriate advisor
-            if advisor_type == "investment":
-                return self.investment_advisor.process_advisory_request(request).answer
-            elif advisor_type == "tax":
-                request.advisory_type = "tax"
-                return self.financial_advisor.process_advisory_request(request).answer
-            elif advisor_type == "legal":
-                request.advisory_type = "legal"
-                return self.financial_advisor.process_advisory_request(request).answer
-            else:  # financial or undefined
-                request.advisory_type = "financial"
-                return self.financial_advisor.process_advisory_request(request).answer
+            return advisor.process_advisory_request(request).answer
         
         except Exception as e:
             logger.error(f"Error in handle_message: {str(e)}")
-            return f"Przepraszam, wystąpił błąd podczas przetwarzania Twojej wiadomości. Spróbuj ponownie lub skontaktuj się z pomocą techniczną."
+            return _MSG_GENERIC_ERROR
+    
+    def _enqueue_write(self, func, *args) -> None:
+        """Queue a database write for the background writer thread."""
+        self._write_q.put(partial(func, *args))
+    
+    def _db_writer(self) -> None:
+        """Drain queued database writes in order and periodically flush interaction buffers."""
+        while True:
+            try:
+                job = self._write_q.get(timeout=INTERACTION_FLUSH_INTERVAL)
+            except queue.Empty:
+                self._flush_interaction_buffers()
+                continue
+            try:
+                job()
+            except Exception as e:
+                logger.error(f"Error in background database write: {str(e)}")
+            finally:
+                self._write_q.task_done()
+            if time.monotonic() - self._last_flush >= INTERACTION_FLUSH_INTERVAL:
+                self._flush_interaction_buffers()
+    
+    def _flush_interaction_buffers(self) -> None:
+        """Write buffered chat and decision interactions with one multi-row INSERT per table."""
+        with self._buffer_lock:
+            chat_rows, self._chat_buffer = self._chat_buffer, []
+            decision_rows, self._decision_buffer = self._decision_buffer, []
+        self._last_flush = time.monotonic()
+        
+        if not chat_rows and not decision_rows:
+            return
+        
+        try:
+            with get_thread_db_cursor() as cursor:
+                if chat_rows:
+                    execute_values(
+                        cursor,
+                        "INSERT INTO chat_interactions (user_id, question, reply, context, timestamp) VALUES %s",
+                        chat_rows,
+                        page_size=INTERACTION_FLUSH_SIZE
+                    )
+                if decision_rows:
+                    execute_values(
+                        cursor,
+                        "INSERT INTO decision_interactions (user_id, node_id, selection, context, timestamp) VALUES %s",
+                        decision_rows,
+                        page_size=INTERACTION_FLUSH_SIZE
+                    )
+            logger.info(f"Saved {len(chat_rows)} chat and {len(decision_rows)} decision interactions")
+        except Exception as e:
+            logger.error(f"Error saving data to database: {str(e)}")
+            self._requeue_interactions(chat_rows, decision_rows)
+    
+    def _requeue_interactions(self, chat_rows: List[tuple], decision_rows: List[tuple]) -> None:
+        """Put rows from a failed flush back in front of the buffers so the next flush retries them."""
+        with self._buffer_lock:
+            self._chat_buffer[:0] = chat_rows
+            self._decision_buffer[:0] = decision_rows
+            dropped_chat = max(0, len(self._chat_buffer) - INTERACTION_BUFFER_MAX)
+            dropped_decision = max(0, len(self._decision_buffer) - INTERACTION_BUFFER_MAX)
+            del self._chat_buffer[:dropped_chat]
+            del self._decision_buffer[:dropped_decision]
+        if dropped_chat or dropped_decision:
+            logger.error(f"Dropped {dropped_chat} chat and {dropped_decision} decision interactions after failed writes")
+    
+    def flush_pending_writes(self) -> None:
+        """Block until all queued and buffered database writes have been executed."""
+        self._write_q.put(self._flush_interaction_buffers)
+        self._write_q.join()
     
-    def _determine_advisor_from_message(self, message: str) -> str:
+    def _determine_advisor_from_message(self, message: str, message_norm: Optional[str] = None) -> str:
         """
         Determine advisor type based on message content.
         
         Args:
             message: User message text
+            message_norm: Already normalized message (see _normalize_message), if the caller has it
             
         Returns:
             Advisor type (tax, legal, investment, or financial)
         """
-        message = message.lower()
-        
-        # Keywords for each advisor type
-        tax_keywords = ["podatek", "podatki", "pit", "vat", "cit", "zeznanie", "zwrot", "urząd skarbowy", "odliczenie"]
-        legal_keywords = ["prawo", "prawne", "umowa", "przepisy", "regulacje", "ustawa", "kodeks", "kontrakt"]
-        investment_keywords = ["inwestycja", "inwestowanie", "giełda", "akcje", "obligacje", "fundusz", "portfel", "etf", "dywidenda"]
-        financial_keywords = ["budżet", "oszczędności", "wydatki", "dochody", "kredyt", "pożyczka", "planowanie", "emerytura", "ubezpieczenie"]
-        
-        # Check for keywords
-        if any(keyword in message for keyword in tax_keywords):
-            return "tax"
-        elif any(keyword in message for keyword in legal_keywords):
-            return "legal"
-        elif any(keyword in message for keyword in investment_keywords):
-            return "investment"
-        elif any(keyword in message for keyword in financial_keywords):
-            return "financial"
+        if message_norm is None:
+            message_norm = _normalize_message(message)
+        
+        # Check for keywords (tax > legal > investment > financial)
+        advisor_type = _best_match(self._advisor_ac, message_norm)
         
         # Default to financial advisor
-        return "financial"
+        return advisor_type or "financial"
     
     def _enhance_context_with_behavioral_profile(self, context: Dict[str, Any]) -> None:
         """
@@ -179,35 +486,21 @@ class AIChatSelector:
         
         # Add communication style preferences
         if "decision_style" in profile:
-            decision_style = profile["decision_style"]
-            if decision_style == "analytical":
-                context["communication_style"] = "Preferencja dla danych, liczb i szczegółowych analiz."
-            elif decision_style == "intuitive":
-                context["communication_style"] = "Preferencja dla szerszego obrazu, metafor i przykładów."
-            elif decision_style == "consultative":
-                context["communication_style"] = "Preferencja dla różnych perspektyw i opinii ekspertów."
-            elif decision_style == "directive":
-                context["communication_style"] = "Preferencja dla konkretnych, bezpośrednich wskazówek."
+            communication_style = DECISION_STYLE_DESCRIPTIONS.get(profile["decision_style"])
+            if communication_style:
+                context["communication_style"] = communication_style
         
         # Add risk tolerance information
         if "risk_tolerance" in profile:
-            risk_tolerance = profile["risk_tolerance"]
-            if risk_tolerance == "conservative":
-                context["investment_style"] = "Bezpieczeństwo i stabilność są priorytetem."
-            elif risk_tolerance == "moderate":
-                context["investment_style"] = "Zrównoważone podejście do ryzyka i zysku."
-            elif risk_tolerance == "aggressive":
-                context["investment_style"] = "Akceptacja wyższego ryzyka dla wyższych potencjalnych zysków."
+            investment_style = RISK_TOLERANCE_DESCRIPTIONS.get(profile["risk_tolerance"])
+            if investment_style:
+                context["investment_style"] = investment_style
         
         # Add time preference
         if "time_preference" in profile:
-            time_preference = profile["time_preference"]
-            if time_preference == "short_term":
-                context["planning_horizon"] = "Krótkoterminowe planowanie (do 1 roku)."
-            elif time_preference == "medium_term":
-                context["planning_horizon"] = "Średnioterminowe planowanie (1-5 lat)."
-            elif time_preference == "long_term":
-                context["planning_horizon"] = "Długoterminowe planowanie (powyżej 5 lat)."
+            planning_horizon = TIME_PREFERENCE_DESCRIPTIONS.get(profile["time_preference"])
+            if planning_horizon:
+                context["planning_horizon"] = planning_horizon
     
     def _save_profile_to_database(self, user_id: int, profile_data: Dict[str, Any]) -> None:
         """
@@ -218,42 +511,19 @@ class AIChatSelector:
             profile_data: Profile data dictionary
         """
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Check if user profile exists
-            cursor.execute("SELECT id FROM user_profiles WHERE user_id = %s", (user_id,))
-            result = cursor.fetchone()
-            
             # Prepare data for database
-            financial_data = json.dumps(profile_data.get("financial_data", {}))
-            behavioral_profile = json.dumps(profile_data.get("behavioral_profile", {}))
+            financial_data = _dumps(profile_data.get("financial_data", {}))
+            behavioral_profile = _dumps(profile_data.get("behavioral_profile", {}))
             recommended_advisor = profile_data.get("recommended_advisor", "financial")
             
-            if result:
-                # Update existing profile
-                cursor.execute(
-                    """
-                    UPDATE user_profiles 
-                    SET financial_data = %s, behavioral_profile = %s, recommended_advisor = %s, updated_at = NOW()
-                    WHERE user_id = %s
-                    """,
-                    (financial_data, behavioral_profile, recommended_advisor, user_id)
-                )
-            else:
-                # Create new profile
-                cursor.execute(
-                    """
-                    INSERT INTO user_profiles (user_id, financial_data, behavioral_profile, recommended_advisor, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, NOW(), NOW())
-                    """,
+            with get_thread_db_cursor() as cursor:
+                # Create or update the profile in a single round-trip (user_id is UNIQUE)
+                execute_prepared(
+                    cursor, "upsert_profile", _SQL_UPSERT_PROFILE,
                     (user_id, financial_data, behavioral_profile, recommended_advisor)
                 )
             
-            conn.commit()
-            cursor.close()
-            conn.close()
-            
+            _invalidate_cached_profile(user_id)
             logger.info(f"Profile for user {user_id} saved successfully")
         except Exception as e:
             logger.error(f"Error saving profile to database: {str(e)}")
@@ -268,29 +538,29 @@ class AIChatSelector:
         Returns:
             Profile data dictionary or None if not found
         """
+        cached = _get_cached_profile(user_id)
+        if cached is not None:
+            return cached
+        
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Get user profile
-            cursor.execute(
-                "SELECT financial_data, behavioral_profile, recommended_advisor FROM user_profiles WHERE user_id = %s",
-                (user_id,)
-            )
-            result = cursor.fetchone()
-            cursor.close()
-            conn.close()
+            with get_db_cursor(commit=False) as cursor:
+                # Get user profile
+                execute_prepared(cursor, "load_profile", _SQL_LOAD_PROFILE, (user_id,))
+                result = cursor.fetchone()
             
             if result:
-                financial_data = json.loads(result[0]) if result[0] else {}
-                behavioral_profile = json.loads(result[1]) if result[1] else {}
+                # JSONB columns arrive decoded (JsonbConnection in core.database)
+                financial_data = result[0] or {}
+                behavioral_profile = result[1] or {}
                 recommended_advisor = result[2]
                 
-                return {
+                profile = {
                     "financial_data": financial_data,
                     "behavioral_profile": behavioral_profile,
                     "recommended_advisor": recommended_advisor
                 }
+                _set_cached_profile(user_id, profile)
+                return profile
             
             return None
         except Exception as e:
@@ -306,31 +576,15 @@ class AIChatSelector:
             advisor_type: Recommended advisor type
         """
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Check if user profile exists
-            cursor.execute("SELECT id FROM user_profiles WHERE user_id = %s", (user_id,))
-            result = cursor.fetchone()
-            
-            if result:
-                # Update advisor
-                cursor.execute(
-                    """
-                    UPDATE user_profiles 
-                    SET recommended_advisor = %s, updated_at = NOW()
-                    WHERE user_id = %s
-                    """,
-                    (advisor_type, user_id)
-                )
-                conn.commit()
+            with get_thread_db_cursor() as cursor:
+                # Update advisor; a no-op when the user has no profile yet
+                execute_prepared(cursor, "update_advisor", _SQL_UPDATE_ADVISOR, (advisor_type, user_id))
             
-            cursor.close()
-            conn.close()
+            _invalidate_cached_profile(user_id)
         except Exception as e:
             logger.error(f"Error updating user advisor: {str(e)}")
     
-    def check_decision_tree_readiness(self, message: str, user_id: Optional[int], context: Dict[str, Any]) -> Dict[str, Any]:
+    def check_decision_tree_readiness(self, message: str, user_id: Optional[int], context: Dict[str, Any], message_norm: Optional[str] = None) -> Dict[str, Any]:
         """
         Check if user is ready for the decision tree.
         
@@ -338,41 +592,35 @@ class AIChatSelector:
             message: User message
             user_id: User ID
             context: Context information
+            message_norm: Already normalized message (see _normalize_message), if the caller has it
             
         Returns:
             Dictionary with decision tree readiness information
         """
-        # Decision tree triggers
-        tree_triggers = [
-            "pokaż opcje", "drzewo decyzyjne", "pomóż mi krok po kroku", 
-            "potrzebuję wskazówek", "jakie mam możliwości", "pokaz opcje",
-            "co proponujesz", "jakie są opcje", "co mogę zrobić", "pokaż możliwości"
-        ]
+        if message_norm is None:
+            message_norm = _normalize_message(message)
         
-        message_lower = message.lower()
+        # Scan once for explicit triggers and implicit guidance requests (triggers win)
+        readiness = _best_match(self._tree_ac, message_norm)
         
         # Check if message contains any triggers
-        if any(trigger in message_lower for trigger in tree_triggers):
+        if readiness == "trigger":
             # Determine appropriate starting node
-            advisor_type = context.get("recommended_advisor", self._determine_advisor_from_message(message))
+            advisor_type = (context["recommended_advisor"] if "recommended_advisor" in context
+                            else self._determine_advisor_from_message(message, message_norm))
             
             # Prepare response
             return {
                 "ready_for_tree": True,
                 "advisor_type": advisor_type,
-                "message": "Przejdźmy do bardziej strukturyzowanego podejścia. Zaraz przedstawię Ci kilka opcji, które pomogą mi lepiej zrozumieć Twoją sytuację i dostarczyć konkretne rekomendacje."
+                "message": _MSG_TREE_INTRO
             }
         
         # Check message content for implicit requests for guidance
-        guidance_indicators = [
-            "nie wiem co robić", "doradź mi", "co powinienem", "co powinnam",
-            "najlepsze opcje", "co byś radził", "powiedz mi co", "pomóż mi zdecydować"
-        ]
-        
-        if any(indicator in message_lower for indicator in guidance_indicators):
+        if readiness == "guidance":
             return {
                 "ready_for_tree": True,
-                "message": "Widzę, że szukasz konkretnych wskazówek. Najlepiej będzie, jeśli przeprowadzę Cię przez serię pytań, które pomogą mi lepiej zrozumieć Twoją sytuację. Czy chcesz przejść do takiego ustrukturyzowanego podejścia?"
+                "message": _MSG_TREE_GUIDANCE
             }
         
         # Not ready for decision tree
@@ -392,11 +640,11 @@ class AIChatSelector:
         try:
             # Store user profile if not already in user_forms
             if user_id not in self.user_forms:
-                self.user_forms[user_id] = UserProfileForm()
+                self.user_forms[user_id] = _new_user_form()
                 self.user_forms[user_id].is_complete = True
             
             # Save profile to database
-            self._save_profile_to_database(user_id, profile_data)
+            self._enqueue_write(self._save_profile_to_database, user_id, profile_data)
             
             # Determine best advisor based on profile
             advisor_type = profile_data.get("recommended_advisor", "financial")
@@ -416,67 +664,56 @@ class AIChatSelector:
             financial_goal = behavioral_profile.get("financial_goal", "")
             risk_tolerance = behavioral_profile.get("risk_tolerance", "")
             
-            greeting = f"Witaj{' ' + name if name else ''}! "
-            greeting += "Dziękuję za wypełnienie formularza. "
+            parts = [f"Witaj {name}! " if name else "Witaj! ", _MSG_FORM_THANKS]
             
             if financial_goal:
-                greeting += f"Widzę, że Twoim głównym celem finansowym jest: {financial_goal}. "
+                parts.append(f"Widzę, że Twoim głównym celem finansowym jest: {financial_goal}. ")
             
             if risk_tolerance:
-                tolerance_descriptions = {
-                    "conservative": "ostrożne podejście do ryzyka",
-                    "moderate": "zrównoważone podejście do ryzyka",
-                    "aggressive": "otwartość na wyższe ryzyko dla potencjalnie wyższych zysków"
-                }
-                tolerance_desc = tolerance_descriptions.get(risk_tolerance, "")
+                tolerance_desc = RISK_TOLERANCE_GREETINGS.get(risk_tolerance, "")
                 if tolerance_desc:
-                    greeting += f"Zauważyłem, że preferujesz {tolerance_desc}. "
+                    parts.append(f"Zauważyłem, że preferujesz {tolerance_desc}. ")
             
-            greeting += "W jaki sposób mogę Ci pomóc w osiągnięciu Twoich celów finansowych? Możemy omówić konkretne strategie, przejść przez drzewo decyzyjne, lub odpowiem na Twoje pytania."
+            parts.append(_MSG_GREETING_CLOSING)
+            greeting = "".join(parts)
             
             # Save this initial interaction
             initial_message = {
                 "user_id": user_id,
-                "question": "Rozpoczęcie rozmowy po formularzu",
+                "question": _MSG_INITIAL_QUESTION,
                 "answer": greeting,
                 "advisory_type": advisor_type,
                 "context": context
             }
             
             # Store in database or session storage
-            self._save_initial_interaction(initial_message)
+            self._enqueue_write(self._save_initial_interaction, initial_message)
             
             return greeting
             
         except Exception as e:
             logger.error(f"Error starting conversation after form: {str(e)}")
-            return "Witaj! Dziękuję za wypełnienie formularza. W czym mogę Ci pomóc?"
+            return _MSG_GREETING_FALLBACK
     
     def _save_initial_interaction(self, interaction_data: Dict[str, Any]) -> None:
         """Save initial interaction to database."""
         try:
             # Implementation depends on your database structure
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                INSERT INTO chat_interactions 
-                (user_id, question, reply, advisor_type, context, timestamp)
-                VALUES (%s, %s, %s, %s, %s, NOW())
-                """,
-                (
-                    interaction_data["user_id"],
-                    interaction_data["question"],
-                    interaction_data["answer"],
-                    interaction_data["advisory_type"],
-                    json.dumps(interaction_data["context"]) if "context" in interaction_data else None
+            with get_thread_db_cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO chat_interactions 
+                    (user_id, question, reply, advisor_type, context, timestamp)
+                    VALUES (%s, %s, %s, %s, %s, NOW())
+                    """,
+                    (
+                        interaction_data["user_id"],
+                        interaction_data["question"],
+                        interaction_data["answer"],
+                        interaction_data["advisory_type"],
+                        _dumps(interaction_data["context"]) if "context" in interaction_data else None
+                    )
                 )
-            )
-            
-            conn.commit()
-            cursor.close()
-            conn.close()
             logger.info(f"Initial interaction saved for user {interaction_data['user_id']}")
         except Exception as e:
             logger.error(f"Error saving initial interaction: {str(e)}")
@@ -527,13 +764,15 @@ class AIChatSelector:
         return {
             "transition_to_tree": True,
             "tree_request": tree_request,
-            "message": readiness_check.get("message", "Przejdźmy do bardziej strukturyzowanego podejścia, aby lepiej zrozumieć Twoje potrzeby i dostarczyć konkretne rekomendacje.")
+            "message": readiness_check.get("message", _MSG_TREE_TRANSITION)
         }
     
     def save_chat_and_decision_data(self, user_id: int, message_type: str, content: Any, context: Optional[Dict[str, Any]] = None) -> None:
         """
         Save chat messages and decision tree interactions to database.
         
+        Rows are buffered and written in batches by the background writer.
+        
         Args:
             user_id: User ID
             message_type: Type of message ("user_message", "ai_response", "decision")
@@ -541,42 +780,22 @@ class AIChatSelector:
             context: Additional context
         """
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
+            context_json = _dumps(context) if context else None
+            timestamp = datetime.now()
             
             # Check what type of data we're saving
-            if message_type == "user_message":
-                cursor.execute(
-                    """
-                    INSERT INTO chat_interactions 
-                    (user_id, question, context, timestamp)
-                    VALUES (%s, %s, %s, NOW())
-                    """, 
-                    (user_id, content, json.dumps(context) if context else None)
-                )
-            elif message_type == "ai_response":
-                cursor.execute(
-                    """
-                    INSERT INTO chat_interactions 
-                    (user_id, reply, context, timestamp)
-                    VALUES (%s, %s, %s, NOW())
-                    """, 
-                    (user_id, content, json.dumps(context) if context else None)
-                )
-            elif message_type == "decision":
-                cursor.execute(
-                    """
-                    INSERT INTO decision_interactions 
-                    (user_id, node_id, selection, context, timestamp)
-                    VALUES (%s, %s, %s, %s, NOW())
-                    """, 
-                    (user_id, content.get("node_id"), content.get("selection"), 
-                    json.dumps(context) if context else None)
-                )
-                
-            conn.commit()
-            cursor.close()
-            conn.close()
-            logger.info(f"Saved {message_type} data for user {user_id}")
+            with self._buffer_lock:
+                if message_type == "user_message":
+                    self._chat_buffer.append((user_id, content, None, context_json, timestamp))
+                elif message_type == "ai_response":
+                    self._chat_buffer.append((user_id, None, content, context_json, timestamp))
+                elif message_type == "decision":
+                    self._decision_buffer.append(
+                        (user_id, content.get("node_id"), content.get("selection"), context_json, timestamp)
+                    )
+                buffered = len(self._chat_buffer) + len(self._decision_buffer)
+            
+            if buffered >= INTERACTION_FLUSH_SIZE:
+                self._write_q.put(self._flush_interaction_buffers)
         except Exception as e:
-            logger.error(f"Error saving data to database: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error saving data to database: {str(e)}")
@@ -3,27 +3,83 @@ import numpy as np
 import pandas as pd
 import joblib
 import os
+import uuid
 import logging
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import Pipeline
-from typing import Dict, List, Tuple, Any, Optional
+import functools
+import threading
+from typing import Dict, List, Tuple, Any, Optional, Union
+try:
+    import onnxruntime as ort
+except ImportError:  # serve predictions with the sklearn forest instead
+    ort = None
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=4)
+def _load_model_bundle(path: str) -> Dict[str, Any]:
+    """
+    Load a saved model bundle, cached per path for the lifetime of the process.
+    
+    The returned objects are shared between EnhancedFinancialModel instances and
+    must not be mutated in place. Large arrays are memory-mapped read-only, so
+    worker processes loading the same file share its pages in the OS cache.
+    """
+    return joblib.load(path, mmap_mode="r")
+
+@functools.lru_cache(maxsize=4)
+def _load_onnx_session(path: str) -> Any:
+    """Create an onnxruntime session for an exported forest, cached per path."""
+    return ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+
+# Forest sizes evaluated by warm-starting one forest per search candidate
+_N_ESTIMATORS_GRID = (50, 100, 200)
+
+# Lower bound on pruned forest size so predicted probabilities stay graded
+_MIN_PRUNED_TREES = 32
+
+# Status names indexed by the int8 label codes used in training
+_CLASS_NAMES = np.array(["stable", "good", "unstable"])
+_STABLE, _GOOD, _UNSTABLE = 0, 1, 2
+
+# Engineered feature order produced by _engineer_features
+_FEATURE_NAMES = (
+    "income", "expenses", "assets_value", "current_savings",
+    "debt_to_income", "savings_rate", "expense_to_income"
+)
+
+def _engineer_features(income: float, expenses: float, assets_value: float, current_savings: float,
+                       total_debt: float, savings_goal: float) -> Tuple[float, ...]:
+    """Engineer one user's features from plain floats, in _FEATURE_NAMES order."""
+    if income > 0:
+        debt_to_income = total_debt / income
+        expense_to_income = expenses / income
+    else:
+        debt_to_income = expense_to_income = 0.0
+    savings_rate = current_savings / savings_goal if savings_goal > 0 else 0.0
+    return (income, expenses, assets_value, current_savings,
+            debt_to_income, savings_rate, expense_to_income)
+
+# Raw input columns consumed by preprocess_batch
+_INPUT_COLUMNS = ("income", "expenses", "assets_value", "current_savings", "total_debt", "savings_goal")
+
 class EnhancedFinancialModel:
     """Enhanced financial prediction model using ensemble methods."""
     
     def __init__(self, model_path: str = "models/financial_model.joblib"):
         """Initialize the enhanced financial model."""
         self.model_path = model_path
+        self.onnx_path = os.path.splitext(model_path)[0] + ".onnx"
         self.model = None
-        self.scaler = StandardScaler()
-        self.feature_names = [
-            "income", "expenses", "assets_value", "current_savings", 
-            "debt_to_income", "savings_rate", "expense_to_income"
-        ]
+        self._ort = None
+        self._fingerprint: Optional[str] = None
+        self.scaler = None
+        self.class_names_ = _CLASS_NAMES
+        self._class_names: List[str] = []
+        self._mean: Optional[np.ndarray] = None
+        self._scale: Optional[np.ndarray] = None
+        self._feature_index: Optional[List[int]] = None
+        self._local = threading.local()
+        self.feature_names = list(_FEATURE_NAMES)
         
         # Create models directory if it doesn't exist
         os.makedirs(os.path.dirname(model_path), exist_ok=True)
@@ -36,93 +92,110 @@ class EnhancedFinancialModel:
     
     def preprocess_data(self, data: Dict[str, float]) -> np.ndarray:
         """Preprocess financial data and engineer features."""
+        return self.preprocess_batch(data)
+    
+    def preprocess_batch(self, data: Union[pd.DataFrame, Dict[str, Any]]) -> np.ndarray:
+        """
+        Preprocess a batch of users and engineer features.
+        
+        Accepts a DataFrame or a mapping of column name to array (or scalar for a
+        single user); missing columns default to 0. Returns an (n_users, n_features)
+        matrix in feature_names order.
+        """
+        if isinstance(data, pd.DataFrame):
+            n_rows = len(data)
+        else:
+            n_rows = max((np.size(data[name]) for name in _INPUT_COLUMNS if name in data), default=1)
+        
+        def column(name: str) -> np.ndarray:
+            if name in data:
+                return np.asarray(data[name], dtype=np.float64).reshape(-1)
+            return np.zeros(n_rows)
+        
         # Extract base features
         features = {
-            "income": data.get("income", 0.0),
-            "expenses": data.get("expenses", 0.0),
-            "assets_value": data.get("assets_value", 0.0),
-            "current_savings": data.get("current_savings", 0.0)
+            "income": column("income"),
+            "expenses": column("expenses"),
+            "assets_value": column("assets_value"),
+            "current_savings": column("current_savings")
         }
+        total_debt = column("total_debt")
+        savings_goal = column("savings_goal")
         
-        # Engineer additional features
-        if features["income"] > 0:
-            features["debt_to_income"] = data.get("total_debt", 0.0) / features["income"]
-            features["expense_to_income"] = features["expenses"] / features["income"]
-        else:
-            features["debt_to_income"] = 0.0
-            features["expense_to_income"] = 0.0
-            
-        if data.get("savings_goal", 0.0) > 0:
-            features["savings_rate"] = features["current_savings"] / data.get("savings_goal")
-        else:
-            features["savings_rate"] = 0.0
+        # Engineer additional features (ratios are 0 when the denominator is not positive)
+        has_income = features["income"] > 0
+        safe_income = np.where(has_income, features["income"], 1.0)
+        features["debt_to_income"] = np.where(has_income, total_debt / safe_income, 0.0)
+        features["expense_to_income"] = np.where(has_income, features["expenses"] / safe_income, 0.0)
+        
+        has_goal = savings_goal > 0
+        features["savings_rate"] = np.where(
+            has_goal, features["current_savings"] / np.where(has_goal, savings_goal, 1.0), 0.0
+        )
         
-        # Convert to numpy array in correct order
-        X = np.array([[features[name] for name in self.feature_names]])
-        return X
+        # Stack columns in correct order
+        return np.column_stack([features[name] for name in self.feature_names])
     
     def generate_synthetic_data(self, n_samples: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
         """Generate synthetic financial data for model training."""
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
+        
+        # Feature matrix filled column by column, in _FEATURE_NAMES order
+        X = np.empty((n_samples, len(_FEATURE_NAMES)), dtype=np.float32)
+        (incomes, expenses, assets, savings,
+         debt_to_income, savings_rate, expense_to_income) = X.T
         
         # Generate random financial data
-        incomes = np.random.lognormal(mean=8.5, sigma=0.4, size=n_samples)  # Mean around 5000
-        expense_ratios = np.random.beta(5, 15, size=n_samples)  # Most people spend 20-40% of income
-        expenses = incomes * expense_ratios
-        assets = np.random.lognormal(mean=10, sigma=1, size=n_samples)  # Mean around 22000
-        savings = np.random.lognormal(mean=7, sigma=1, size=n_samples)  # Mean around 1100
-        debts = np.random.lognormal(mean=8, sigma=1.2, size=n_samples)  # Mean around 3000
+        incomes[:] = rng.lognormal(mean=8.5, sigma=0.4, size=n_samples)  # Mean around 5000
+        expense_ratios = rng.beta(5, 15, size=n_samples)  # Most people spend 20-40% of income
+        expenses[:] = incomes * expense_ratios
+        assets[:] = rng.lognormal(mean=10, sigma=1, size=n_samples)  # Mean around 22000
+        savings[:] = rng.lognormal(mean=7, sigma=1, size=n_samples)  # Mean around 1100
+        debts = rng.lognormal(mean=8, sigma=1.2, size=n_samples).astype(np.float32, copy=False)  # Mean around 3000
         
         # Calculate derived features
-        debt_to_income = debts / incomes
-        savings_rate = savings / (incomes * 12)  # Annual savings rate
-        expense_to_income = expenses / incomes
-        
-        # Create feature matrix
-        X = np.column_stack([
-            incomes, expenses, assets, savings, 
-            debt_to_income, savings_rate, expense_to_income
-        ])
-        
-        # Generate labels based on financial health rules
-        y = []
-        for i in range(n_samples):
-            if debt_to_income[i] > 0.5 or expense_to_income[i] > 0.8:
-                y.append("unstable")  # High debt or expenses relative to income
-            elif savings_rate[i] > 0.2 and expense_to_income[i] < 0.5:
-                y.append("good")  # Good savings and low expenses
-            else:
-                y.append("stable")  # Default case
-        
-        return X, np.array(y)
+        np.divide(debts, incomes, out=debt_to_income)
+        np.divide(savings, incomes * 12, out=savings_rate)  # Annual savings rate
+        np.divide(expenses, incomes, out=expense_to_income)
+        
+        # Generate labels based on financial health rules (first matching rule wins)
+        unstable = (debt_to_income > 0.5) | (expense_to_income > 0.8)  # High debt or expenses relative to income
+        good = (savings_rate > 0.2) & (expense_to_income < 0.5)  # Good savings and low expenses
+        y = np.select([unstable, good], [_UNSTABLE, _GOOD], default=_STABLE).astype(np.int8)
+        
+        return X, y
     
     def train_model_with_synthetic_data(self):
         """Train the model using synthetic financial data."""
+        # Training-only dependencies are imported here to keep module import cheap
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+        
         logger.info("Generating synthetic data for model training")
         X, y = self.generate_synthetic_data(n_samples=5000)
         
-        # Split data
+        # Split data (the validation part is only used to prune the forest)
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        X_train, X_val, y_train, y_val = train_test_split(X_train, y_train, test_size=0.2, random_state=42)
         
-        # Scale features
+        # Scale features (fresh scaler; a loaded one may be shared through the bundle cache)
+        self.scaler = StandardScaler()
         self.scaler.fit(X_train)
         X_train_scaled = self.scaler.transform(X_train)
+        X_val_scaled = self.scaler.transform(X_val)
         X_test_scaled = self.scaler.transform(X_test)
         
-        # Define model pipeline with hyperparameter tuning
+        # Hyperparameter tuning, then refit the best configuration on all training data
         logger.info("Training Random Forest model with hyperparameter tuning")
-        param_grid = {
-            'n_estimators': [50, 100, 200],
-            'max_depth': [None, 10, 20, 30],
-            'min_samples_split': [2, 5, 10]
-        }
+        best_params = self._search_forest_params(X_train_scaled, y_train)
+        self.model = RandomForestClassifier(random_state=42, n_jobs=-1, **best_params)
+        self.model.fit(X_train_scaled, y_train)
         
-        rf = RandomForestClassifier(random_state=42)
-        grid_search = GridSearchCV(rf, param_grid, cv=5, scoring='accuracy')
-        grid_search.fit(X_train_scaled, y_train)
-        
-        # Get best model
-        self.model = grid_search.best_estimator_
+        # Single-row predictions are faster without a worker pool
+        self.model.set_params(n_jobs=1)
+        self._prune_forest(X_val_scaled, y_val)
+        self._cache_model_metadata()
         
         # Evaluate model
         accuracy = self.model.score(X_test_scaled, y_test)
@@ -131,22 +204,87 @@ class EnhancedFinancialModel:
         # Save model
         self.save_model()
     
+    def _search_forest_params(self, X: np.ndarray, y: np.ndarray, n_iter: int = 5, cv: int = 5) -> Dict[str, Any]:
+        """
+        Cross-validated random search over forest hyperparameters.
+        
+        Tree-shape parameters are sampled; for each sample and fold a single
+        warm-started forest is grown through _N_ESTIMATORS_GRID and scored at
+        every size, so larger forests reuse the trees of smaller ones instead
+        of being refit from scratch.
+        """
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.model_selection import ParameterSampler, StratifiedKFold
+        from scipy.stats import randint
+        
+        param_dist = {
+            'max_depth': [None, 10, 20, 30],
+            'min_samples_split': randint(2, 11)
+        }
+        folds = list(StratifiedKFold(n_splits=cv).split(X, y))
+        
+        best_score, best_params = -1.0, None
+        for params in ParameterSampler(param_dist, n_iter=n_iter, random_state=42):
+            scores = np.zeros(len(_N_ESTIMATORS_GRID))
+            for train_idx, test_idx in folds:
+                rf = RandomForestClassifier(warm_start=True, random_state=42, n_jobs=-1, **params)
+                for i, n_estimators in enumerate(_N_ESTIMATORS_GRID):
+                    rf.set_params(n_estimators=n_estimators)
+                    rf.fit(X[train_idx], y[train_idx])
+                    scores[i] += rf.score(X[test_idx], y[test_idx])
+            
+            best_idx = int(np.argmax(scores))
+            if scores[best_idx] > best_score:
+                best_score = scores[best_idx]
+                best_params = dict(params, n_estimators=_N_ESTIMATORS_GRID[best_idx])
+        
+        logger.info(f"Best forest parameters: {best_params} (cv accuracy {best_score / cv:.4f})")
+        return best_params
+    
+    def _prune_forest(self, X_val: np.ndarray, y_val: np.ndarray):
+        """
+        Shrink the fitted forest to the smallest set of trees that keeps its accuracy.
+        
+        Trees are ranked by their individual validation accuracy and the shortest
+        prefix whose averaged vote matches the full forest on X_val is kept (never
+        fewer than _MIN_PRUNED_TREES, so confidences are not all 0 or 1). The kept
+        trees are not modified, so their predictions are unchanged.
+        """
+        estimators = self.model.estimators_
+        classes = self.model.classes_
+        y_idx = np.searchsorted(classes, y_val)
+        
+        # Per-tree class probabilities, shape (n_trees, n_samples, n_classes)
+        tree_proba = np.stack([est.predict_proba(X_val) for est in estimators])
+        tree_accuracy = (tree_proba.argmax(axis=2) == y_idx).mean(axis=1)
+        order = np.argsort(-tree_accuracy, kind="stable")
+        
+        # Accuracy of the averaged vote of the best k trees, for every k
+        cumulative = np.cumsum(tree_proba[order], axis=0)
+        ensemble_accuracy = (cumulative.argmax(axis=2) == y_idx).mean(axis=1)
+        full_accuracy = (tree_proba.mean(axis=0).argmax(axis=1) == y_idx).mean()
+        keep = int(np.argmax(ensemble_accuracy >= full_accuracy)) + 1
+        keep = min(max(keep, _MIN_PRUNED_TREES), len(estimators))
+        
+        self.model.estimators_ = [estimators[i] for i in order[:keep]]
+        self.model.n_estimators = keep
+        
+        logger.info(f"Forest pruned from {len(estimators)} to {keep} trees "
+                    f"(validation accuracy {ensemble_accuracy[keep - 1]:.4f} vs {full_accuracy:.4f})")
+    
     def predict_financial_status(self, data: Dict[str, float]) -> Dict[str, Any]:
         """Predict financial status based on user data."""
         if self.model is None:
             self.load_model()
             
-        # Preprocess data
-        X = self.preprocess_data(data)
-        X_scaled = self.scaler.transform(X)
+        # Preprocess and scale in place in this thread's float32 row buffer
+        X_scaled = self._scale_row(data)
         
-        # Make prediction
-        status = self.model.predict(X_scaled)[0]
-        
-        # Get prediction probabilities
-        probabilities = self.model.predict_proba(X_scaled)[0]
-        class_indices = {class_name: i for i, class_name in enumerate(self.model.classes_)}
-        confidence = probabilities[class_indices[status]]
+        # Make prediction; predict() is the argmax of predict_proba, so one forest pass suffices
+        probabilities = self._predict_proba(X_scaled)[0]
+        status_idx = int(np.argmax(probabilities))
+        status = self._class_names[status_idx]
+        confidence = float(probabilities[status_idx])
         
         # Calculate feature importances for this prediction
         importances = {}
@@ -157,30 +295,168 @@ class EnhancedFinancialModel:
         return {
             "status": status,
             "confidence": confidence,
-            "probabilities": {class_name: probabilities[i] for i, class_name in enumerate(self.model.classes_)},
+            "probabilities": dict(zip(self._class_names, probabilities.tolist())),
             "feature_importances": importances
         }
     
+    def predict_financial_status_batch(self, data: Union[pd.DataFrame, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Predict financial status for a batch of users with one scaler and forest pass."""
+        if self.model is None:
+            self.load_model()
+        
+        X_scaled = self.scaler.transform(self.preprocess_batch(data))
+        # Python floats, like predict_financial_status, so results are JSON-serializable
+        probabilities = self._predict_proba(X_scaled.astype(np.float32)).tolist()
+        classes = self._class_names
+        best = np.argmax(probabilities, axis=1)
+        
+        return [
+            {
+                "status": classes[idx],
+                "confidence": row[idx],
+                "probabilities": {class_name: row[i] for i, class_name in enumerate(classes)}
+            }
+            for idx, row in zip(best, probabilities)
+        ]
+    
     def save_model(self):
         """Save the trained model to disk."""
+        # Ties the ONNX export to this bundle, so a stale export is never served
+        self._fingerprint = uuid.uuid4().hex
         model_data = {
             "model": self.model,
             "scaler": self.scaler,
             "feature_names": self.feature_names,
-            "classes": self.model.classes_ if self.model else None
+            "classes": self.model.classes_ if self.model else None,
+            "class_names": self.class_names_,
+            "fingerprint": self._fingerprint
         }
+        # Uncompressed on purpose: joblib can only memory-map uncompressed arrays
         joblib.dump(model_data, self.model_path)
+        _load_model_bundle.cache_clear()
         logger.info(f"Model saved to {self.model_path}")
+        
+        self._export_onnx()
+        self._ort = self._load_onnx()
+    
+    def _export_onnx(self):
+        """Export the forest to ONNX next to the joblib bundle, if skl2onnx is installed."""
+        _load_onnx_session.cache_clear()
+        try:
+            from skl2onnx import convert_sklearn
+            from skl2onnx.common.data_types import FloatTensorType
+        except ImportError:
+            self._remove_onnx()
+            return
+        
+        try:
+            onnx_model = convert_sklearn(
+                self.model,
+                initial_types=[("X", FloatTensorType([None, len(self.feature_names)]))],
+                options={id(self.model): {"zipmap": False}}
+            )
+            meta = onnx_model.metadata_props.add()
+            meta.key, meta.value = "fingerprint", self._fingerprint
+            with open(self.onnx_path, "wb") as f:
+                f.write(onnx_model.SerializeToString())
+            logger.info(f"ONNX model saved to {self.onnx_path}")
+        except Exception as e:
+            logger.error(f"Error exporting model to ONNX: {str(e)}")
+            self._remove_onnx()
+    
+    def _remove_onnx(self):
+        """Delete the export of a previous model, so it is never served for this one."""
+        if os.path.exists(self.onnx_path):
+            os.remove(self.onnx_path)
+    
+    def _load_onnx(self) -> Any:
+        """
+        Return an onnxruntime session for the exported forest, or None to use sklearn.
+        
+        The export is only used when its fingerprint matches the loaded bundle.
+        """
+        if ort is None or self._fingerprint is None or not os.path.exists(self.onnx_path):
+            return None
+        try:
+            session = _load_onnx_session(self.onnx_path)
+        except Exception as e:
+            logger.error(f"Error loading ONNX model: {str(e)}")
+            return None
+        if session.get_modelmeta().custom_metadata_map.get("fingerprint") != self._fingerprint:
+            logger.warning(f"Ignoring {self.onnx_path}: it was exported from a different model")
+            return None
+        return session
+    
+    def _predict_proba(self, X_scaled: np.ndarray) -> np.ndarray:
+        """Class probabilities for scaled float32 rows, via onnxruntime when available."""
+        if self._ort is not None:
+            return self._ort.run(["probabilities"], {"X": X_scaled})[0]
+        return self.model.predict_proba(X_scaled)
+    
+    def _cache_model_metadata(self):
+        """Precompute per-model values used on every prediction."""
+        # Integer label codes map back to status names; older bundles store names directly
+        classes = self.model.classes_
+        if classes.dtype.kind in "iu":
+            self._class_names = [str(name) for name in self.class_names_[classes]]
+        else:
+            self._class_names = [str(name) for name in classes]
+        # Bundles saved with a different feature order need a permutation
+        self._feature_index = (
+            None if tuple(self.feature_names) == _FEATURE_NAMES
+            else [_FEATURE_NAMES.index(name) for name in self.feature_names]
+        )
+        self._mean = self.scaler.mean_.astype(np.float32)
+        self._scale = self.scaler.scale_.astype(np.float32)
+    
+    def _scale_row(self, data: Dict[str, float]) -> np.ndarray:
+        """
+        Engineer and standardize features for a single user without sklearn dispatch.
+        
+        Mirrors preprocess_batch followed by scaler.transform, writing into a
+        preallocated per-thread (1, n_features) float32 buffer that is reused
+        across calls; the returned array is only valid until the next call.
+        """
+        buf = getattr(self._local, "buf", None)
+        if buf is None or buf.shape[1] != len(self.feature_names):
+            buf = self._local.buf = np.empty((1, len(self.feature_names)), dtype=np.float32)
+        
+        values = _engineer_features(
+            float(data.get("income") or 0),
+            float(data.get("expenses") or 0),
+            float(data.get("assets_value") or 0),
+            float(data.get("current_savings") or 0),
+            float(data.get("total_debt") or 0),
+            float(data.get("savings_goal") or 0)
+        )
+        if self._feature_index is None:
+            buf[0] = values
+        else:
+            buf[0] = [values[i] for i in self._feature_index]
+        
+        np.subtract(buf, self._mean, out=buf)
+        np.divide(buf, self._scale, out=buf)
+        return buf
     
     def load_model(self):
         """Load the trained model from disk."""
         try:
-            model_data = joblib.load(self.model_path)
+            model_data = _load_model_bundle(self.model_path)
             self.model = model_data["model"]
             self.scaler = model_data["scaler"]
             self.feature_names = model_data["feature_names"]
+            self.class_names_ = model_data.get("class_names", _CLASS_NAMES)
+            self._fingerprint = model_data.get("fingerprint")
+            self._cache_model_metadata()
+            self._ort = self._load_onnx()
             logger.info(f"Model loaded from {self.model_path}")
         except Exception as e:
             logger.error(f"Error loading model: {str(e)}")
             logger.info("Training new model with synthetic data")
             self.train_model_with_synthetic_data()
+    
+    def reload(self):
+        """Drop the process-wide bundle caches and load the model from disk again."""
+        _load_model_bundle.cache_clear()
+        _load_onnx_session.cache_clear()
+        self.load_model()
@@ -1,15 +1,74 @@
 import os
 import logging
 import json
-import openai
+import functools
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 from core.financial_models import AdvisoryRequest, AdvisoryResponse
+from ai._common import extract_sources
+from ai.llm_client import complete, acomplete, astream_complete
 
 logger = logging.getLogger(__name__)
 
-# Set OpenAI API key from environment variable
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# Fixed additional resources per language
+_RESOURCES_PL = {
+    "Strategie inwestycyjne": "https://www.gpw.pl/strategie-inwestycyjne",
+    "Analiza portfela": "https://www.gpw.pl/analiza-portfela",
+    "Zarządzanie ryzykiem": "https://www.knf.gov.pl/dla_rynku/edukacja_cedur"
+}
+
+_RESOURCES_EN = {
+    "Investment Strategies": "https://www.investopedia.com/investing-strategies-4689738",
+    "Portfolio Analysis": "https://www.morningstar.com/",
+    "Risk Management": "https://www.investor.gov/introduction-investing/investing-basics/investment-risk"
+}
+
+# Answer given when the AI call fails
+_FALLBACK_ANSWER = "I'm unable to provide investment advice on this topic at the moment. Please try again later or rephrase your question."
+
+
+@functools.lru_cache(maxsize=256)
+def _build_system_prompt(risk_profile: Optional[str], financial_status: Optional[str], language: str) -> str:
+    """Build the system prompt; cached on (risk_profile, financial_status, language)."""
+    # Base prompt
+    if language == "pl":
+        base_prompt = "Jesteś ekspertem w dziedzinie inwestycji, specjalizującym się w doradztwie inwestycyjnym, analizie portfela i strategiach inwestycyjnych. Twoja rola polega na udzielaniu jasnych, dokładnych i pomocnych porad dotyczących inwestowania, alokacji aktywów i zarządzania ryzykiem."
+    else:
+        base_prompt = "You are an expert in investments, specializing in investment advisory, portfolio analysis, and investment strategies. Your role is to provide clear, accurate, and helpful advice on investing, asset allocation, and risk management."
+    
+    # Add context-specific information if available
+    if risk_profile is not None:
+        if language == "pl":
+            base_prompt += f"\n\nProfil ryzyka użytkownika: {risk_profile}."
+        else:
+            base_prompt += f"\n\nUser risk profile: {risk_profile}."
+    
+    if financial_status is not None:
+        if language == "pl":
+            base_prompt += f"\n\nStatus finansowy użytkownika: {financial_status}."
+        else:
+            base_prompt += f"\n\nUser financial status: {financial_status}."
+    
+    # Add response guidelines
+    if language == "pl":
+        base_prompt += "\n\nTwoje odpowiedzi powinny być:"\
+                      "\n1. Dokładne i oparte na faktach"\
+                      "\n2. Jasne i zrozumiałe dla osób bez specjalistycznej wiedzy"\
+                      "\n3. Uwzględniające kontekst i profil ryzyka użytkownika"\
+                      "\n4. Zawierające zastrzeżenie, że są to informacje ogólne, a nie profesjonalne porady inwestycyjne"\
+                      "\n5. Przypominające, że wyniki historyczne nie gwarantują przyszłych zwrotów"\
+                      "\n\nOdpowiadaj w języku polskim."
+    else:
+        base_prompt += "\n\nYour responses should be:"\
+                      "\n1. Accurate and fact-based"\
+                      "\n2. Clear and understandable for people without specialized knowledge"\
+                      "\n3. Considerate of the user's context and risk profile"\
+                      "\n4. Include a disclaimer that this is general information, not professional investment advice"\
+                      "\n5. Remind that past performance is not indicative of future results"\
+                      "\n\nRespond in English."
+    
+    return base_prompt
+
 
 class InvestmentAdvisor:
     """
@@ -30,8 +89,53 @@ class InvestmentAdvisor:
         Returns:
             Advisory response with answer and metadata
         """
-        user_id = request.user_id
-        question = request.question
+        # Identical prompts are answered from the cache (see ai.llm_client.complete)
+        answer = complete(self._prepare_messages(request))
+        if answer is None:
+            return self._fallback_response(request)
+        return self._build_response(request, answer)
+    
+    async def aprocess_advisory_request(self, request: AdvisoryRequest) -> AdvisoryResponse:
+        """
+        Process an investment advisory request without blocking the event loop.
+        
+        Args:
+            request: Advisory request containing question and context
+            
+        Returns:
+            Advisory response with answer and metadata
+        """
+        answer = await acomplete(self._prepare_messages(request))
+        if answer is None:
+            return self._fallback_response(request)
+        return self._build_response(request, answer)
+    
+    async def astream_advisory_request(self, request: AdvisoryRequest) -> AsyncIterator[str]:
+        """
+        Stream the answer to an investment advisory request as it is generated.
+        
+        The complete answer is cached once the stream finishes, so a repeated
+        question is served as a single fragment.
+        
+        Args:
+            request: Advisory request containing question and context
+            
+        Yields:
+            Fragments of the answer text
+        """
+        async for fragment in astream_complete(self._prepare_messages(request), _FALLBACK_ANSWER):
+            yield fragment
+    
+    def _prepare_messages(self, request: AdvisoryRequest) -> List[Dict[str, str]]:
+        """
+        Prepare the chat messages for a request.
+        
+        Args:
+            request: Advisory request containing question and context
+            
+        Returns:
+            List of chat messages for the AI
+        """
         context = request.context
         language = request.language or "en"
         
@@ -41,7 +145,7 @@ class InvestmentAdvisor:
         # Prepare messages for the AI
         messages = [
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": question}
+            {"role": "user", "content": request.question}
         ]
         
         # Add context from previous interactions if available
@@ -50,51 +154,52 @@ class InvestmentAdvisor:
                 messages.append({"role": "user", "content": interaction["question"]})
                 messages.append({"role": "assistant", "content": interaction["answer"]})
         
-        try:
-            # Call OpenAI API - CHANGED FROM GPT-4 TO GPT-3.5-TURBO
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",  # Changed from gpt-4 to gpt-3.5-turbo
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1500
-            )
-            
-            # Extract answer from response
-            answer = response.choices[0].message["content"].strip()
-            
-            # Calculate confidence score (simplified)
-            confidence_score = 0.85
-            
-            # Create advisory response
-            advisory_response = AdvisoryResponse(
-                user_id=user_id,
-                question=question,
-                answer=answer,
-                advisory_type="investment",
-                confidence_score=confidence_score,
-                sources=self._extract_sources(answer),
-                disclaimer="This investment advice is for informational purposes only and should not be considered as professional investment advice. Past performance is not indicative of future results.",
-                created_at=datetime.now(),
-                additional_resources=self._get_additional_resources(question, language)
-            )
+        return messages
+    
+    def _build_response(self, request: AdvisoryRequest, answer: str) -> AdvisoryResponse:
+        """
+        Wrap an AI answer in an advisory response.
+        
+        Args:
+            request: Original advisory request
+            answer: AI-generated answer
             
-            return advisory_response
+        Returns:
+            Advisory response with answer and metadata
+        """
+        return AdvisoryResponse(
+            user_id=request.user_id,
+            question=request.question,
+            answer=answer,
+            advisory_type="investment",
+            confidence_score=0.85,
+            sources=self._extract_sources(answer),
+            disclaimer="This investment advice is for informational purposes only and should not be considered as professional investment advice. Past performance is not indicative of future results.",
+            created_at=datetime.now(),
+            additional_resources=self._get_additional_resources(request.question, request.language or "en")
+        )
+    
+    def _fallback_response(self, request: AdvisoryRequest) -> AdvisoryResponse:
+        """
+        Build the fallback response used when the AI call fails.
         
-        except Exception as e:
-            logger.error(f"Error calling OpenAI API: {str(e)}")
+        Args:
+            request: Original advisory request
             
-            # Return a fallback response
-            return AdvisoryResponse(
-                user_id=user_id,
-                question=question,
-                answer="I'm unable to provide investment advice on this topic at the moment. Please try again later or rephrase your question.",
-                advisory_type="investment",
-                confidence_score=0.0,
-                sources=[],
-                disclaimer="This investment advice is for informational purposes only and should not be considered as professional investment advice. Past performance is not indicative of future results.",
-                created_at=datetime.now(),
-                additional_resources={}
-            )
+        Returns:
+            Advisory response with a generic answer
+        """
+        return AdvisoryResponse(
+            user_id=request.user_id,
+            question=request.question,
+            answer=_FALLBACK_ANSWER,
+            advisory_type="investment",
+            confidence_score=0.0,
+            sources=[],
+            disclaimer="This investment advice is for informational purposes only and should not be considered as professional investment advice. Past performance is not indicative of future results.",
+            created_at=datetime.now(),
+            additional_resources={}
+        )
     
     def _prepare_system_prompt(self, context: Dict[str, Any], language: str) -> str:
         """
@@ -107,47 +212,15 @@ class InvestmentAdvisor:
         Returns:
             System prompt for the AI
         """
-        # Base prompt
-        if language == "pl":
-            base_prompt = "Jesteś ekspertem w dziedzinie inwestycji, specjalizującym się w doradztwie inwestycyjnym, analizie portfela i strategiach inwestycyjnych. Twoja rola polega na udzielaniu jasnych, dokładnych i pomocnych porad dotyczących inwestowania, alokacji aktywów i zarządzania ryzykiem."
-        else:
-            base_prompt = "You are an expert in investments, specializing in investment advisory, portfolio analysis, and investment strategies. Your role is to provide clear, accurate, and helpful advice on investing, asset allocation, and risk management."
-        
-        # Add context-specific information if available
+        risk_profile = None
+        financial_status = None
         if context:
             if "risk_profile" in context:
-                risk_profile = context["risk_profile"]
-                if language == "pl":
-                    base_prompt += f"\n\nProfil ryzyka użytkownika: {risk_profile}."
-                else:
-                    base_prompt += f"\n\nUser risk profile: {risk_profile}."
-            
+                risk_profile = str(context["risk_profile"])
             if "financial_status" in context:
-                financial_status = context["financial_status"]
-                if language == "pl":
-                    base_prompt += f"\n\nStatus finansowy użytkownika: {financial_status}."
-                else:
-                    base_prompt += f"\n\nUser financial status: {financial_status}."
-        
-        # Add response guidelines
-        if language == "pl":
-            base_prompt += "\n\nTwoje odpowiedzi powinny być:"\
-                          "\n1. Dokładne i oparte na faktach"\
-                          "\n2. Jasne i zrozumiałe dla osób bez specjalistycznej wiedzy"\
-                          "\n3. Uwzględniające kontekst i profil ryzyka użytkownika"\
-                          "\n4. Zawierające zastrzeżenie, że są to informacje ogólne, a nie profesjonalne porady inwestycyjne"\
-                          "\n5. Przypominające, że wyniki historyczne nie gwarantują przyszłych zwrotów"\
-                          "\n\nOdpowiadaj w języku polskim."
-        else:
-            base_prompt += "\n\nYour responses should be:"\
-                          "\n1. Accurate and fact-based"\
-                          "\n2. Clear and understandable for people without specialized knowledge"\
-                          "\n3. Considerate of the user's context and risk profile"\
-                          "\n4. Include a disclaimer that this is general information, not professional investment advice"\
-                          "\n5. Remind that past performance is not indicative of future results"\
-                          "\n\nRespond in English."
+                financial_status = str(context["financial_status"])
         
-        return base_prompt
+        return _build_system_prompt(risk_profile, financial_status, language)
     
     def _extract_sources(self, answer: str) -> List[str]:
         """
@@ -159,16 +232,7 @@ class InvestmentAdvisor:
         Returns:
             List of sources
         """
-        # Simple implementation - look for sources section
-        sources = []
-        if "Sources:" in answer:
-            sources_section = answer.split("Sources:")[1].strip()
-            sources = [source.strip() for source in sources_section.split("\n") if source.strip()]
-        elif "Źródła:" in answer:  # Added support for Polish sources
-            sources_section = answer.split("Źródła:")[1].strip()
-            sources = [source.strip() for source in sources_section.split("\n") if source.strip()]
-        
-        return sources
+        return extract_sources(answer)
     
     def _get_additional_resources(self, question: str, language: str) -> Dict[str, str]:
         """
@@ -182,15 +246,4 @@ class InvestmentAdvisor:
             Dictionary of additional resources
         """
         # Simple implementation - return fixed resources
-        if language == "pl":
-            return {
-                "Strategie inwestycyjne": "https://www.gpw.pl/strategie-inwestycyjne",
-                "Analiza portfela": "https://www.gpw.pl/analiza-portfela",
-                "Zarządzanie ryzykiem": "https://www.knf.gov.pl/dla_rynku/edukacja_cedur"
-            }
-        else:
-            return {
-                "Investment Strategies": "https://www.investopedia.com/investing-strategies-4689738",
-                "Portfolio Analysis": "https://www.morningstar.com/",
-                "Risk Management": "https://www.investor.gov/introduction-investing/investing-basics/investment-risk"
-            }
+        return _RESOURCES_PL if language == "pl" else _RESOURCES_EN
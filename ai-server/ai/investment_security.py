@@ -1,10 +1,56 @@
-from typing import Dict, List
+import os
+import threading
+from typing import Dict, List, Optional
+import joblib
 import numpy as np
 from sklearn.ensemble import IsolationForest
 from ..utils.logger import logger
+
+DETECTOR_PATH = "models/anomaly_detector.joblib"
+
+# Jeden detektor współdzielony przez wszystkie instancje analizatora
+_GLOBAL_IFOREST: Optional[IsolationForest] = None
+_iforest_lock = threading.Lock()
+
 class InvestmentSecurityAnalyzer:
     def __init__(self):
-        self.anomaly_detector = IsolationForest(contamination=0.1)
+        global _GLOBAL_IFOREST
+        # Wczytaj detektor dopasowany wcześniej na danych historycznych
+        if _GLOBAL_IFOREST is None and os.path.exists(DETECTOR_PATH):
+            with _iforest_lock:
+                if _GLOBAL_IFOREST is None:
+                    try:
+                        _GLOBAL_IFOREST = joblib.load(DETECTOR_PATH)
+                    except Exception as e:
+                        logger.error(f"Error loading anomaly detector: {str(e)}")
+
+    @property
+    def anomaly_detector(self) -> Optional[IsolationForest]:
+        return _GLOBAL_IFOREST
+
+    @classmethod
+    def warmup(cls, historical_features: np.ndarray) -> None:
+        """
+        Fit the shared anomaly detector on historical data and persist it.
+
+        Call this at startup; request data is never used to fit the shared baseline.
+        """
+        global _GLOBAL_IFOREST
+        features = np.asarray(historical_features, dtype=float).reshape(-1, 1)
+        detector = IsolationForest(
+            contamination=0.1, n_estimators=100, n_jobs=-1, random_state=42
+        ).fit(features)
+        with _iforest_lock:
+            _GLOBAL_IFOREST = detector
+        try:
+            os.makedirs(os.path.dirname(DETECTOR_PATH) or ".", exist_ok=True)
+            joblib.dump(detector, DETECTOR_PATH)
+        except Exception as e:
+            logger.error(f"Error saving anomaly detector: {str(e)}")
+
+    def fit_baseline(self, historical_features: np.ndarray) -> None:
+        """Fit the shared anomaly detector on historical data (see warmup)."""
+        self.warmup(historical_features)
         
     def analyze_investment_risk(self, investment_data: Dict) -> Dict:
         try:
@@ -41,13 +87,21 @@ class InvestmentSecurityAnalyzer:
             if len(features) == 0:
                 return ["Brak danych do analizy anomalii"]
 
-            # Dopasowanie modelu i wykrycie anomalii
-            self.anomaly_detector.fit(features)
-            predictions = self.anomaly_detector.predict(features)
+            with _iforest_lock:
+                detector = _GLOBAL_IFOREST
+            if detector is None:
+                # Brak bazy (warmup/fit_baseline) - lokalny detektor tylko dla tego
+                # wywołania; nie jest zapisywany ani współdzielony
+                detector = IsolationForest(
+                    contamination=0.1, n_estimators=100, random_state=42
+                ).fit(features)
+
+            # Tylko ocena - punkty poniżej progu offset_ to anomalie (jak w predict)
+            scores = detector.score_samples(features)
+            indices = np.flatnonzero(scores < detector.offset_).tolist()
 
             # Zwróć listę anomalii
-            anomalies = [f"Anomalia w indeksie {i}" for i, pred in enumerate(predictions) if pred == -1]
-            return anomalies
+            return [f"Anomalia w indeksie {i}" for i in indices]
         except Exception as e:
             logger.error(f"Error in anomaly detection: {str(e)}")
             return [f"Błąd wykrywania anomalii: {str(e)}"]
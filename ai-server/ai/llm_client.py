@@ -0,0 +1,239 @@
+"""
+Shared OpenAI clients for the advisory modules.
+
+The clients are created lazily on first use and reused for the lifetime of
+the process, so every advisor shares one keep-alive HTTP connection pool
+instead of opening a new connection per request. openai and httpx are only
+imported on that first use, keeping them out of worker cold start.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import importlib.util
+import threading
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+
+from cachetools import TTLCache
+
+if TYPE_CHECKING:
+    from openai import OpenAI, AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "100"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "200"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+
+# HTTP/2 multiplexes concurrent requests over one TLS connection; needs the h2 package
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+# Cache of answer strings keyed by a hash of the messages sent to the model
+ADVISOR_CACHE_TTL = int(os.getenv("ADVISOR_CACHE_TTL", "3600"))
+ADVISOR_CACHE_MAX_SIZE = int(os.getenv("ADVISOR_CACHE_MAX_SIZE", "10000"))
+
+# Completion settings shared by the advisory modules
+_COMPLETION_PARAMS = {"model": "gpt-3.5-turbo", "temperature": 0.7, "max_tokens": 1500}
+
+_client: Optional["OpenAI"] = None
+_async_client: Optional["AsyncOpenAI"] = None
+_client_lock = threading.Lock()
+
+_RESP_CACHE: TTLCache = TTLCache(maxsize=ADVISOR_CACHE_MAX_SIZE, ttl=ADVISOR_CACHE_TTL)
+_resp_cache_lock = threading.Lock()
+
+
+def _limits() -> Any:
+    import httpx
+    return httpx.Limits(
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+        max_connections=OPENAI_MAX_CONNECTIONS,
+    )
+
+
+def get_client() -> "OpenAI":
+    """
+    Return the process-wide synchronous OpenAI client.
+
+    Returns:
+        OpenAI client backed by a pooled httpx.Client
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import httpx
+                from openai import OpenAI
+                _client = OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    http_client=httpx.Client(limits=_limits(), timeout=OPENAI_TIMEOUT, http2=_HTTP2),
+                )
+                logger.info("Shared OpenAI client initialized")
+    return _client
+
+
+def get_async_client() -> "AsyncOpenAI":
+    """
+    Return the process-wide asynchronous OpenAI client.
+
+    Returns:
+        AsyncOpenAI client backed by a pooled httpx.AsyncClient
+    """
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                import httpx
+                from openai import AsyncOpenAI
+                _async_client = AsyncOpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    http_client=httpx.AsyncClient(limits=_limits(), timeout=OPENAI_TIMEOUT, http2=_HTTP2),
+                )
+                logger.info("Shared async OpenAI client initialized")
+    return _async_client
+
+
+async def aclose_clients() -> None:
+    """Close the shared clients and their connection pools (call on application shutdown)."""
+    global _client, _async_client
+    with _client_lock:
+        client, async_client = _client, _async_client
+        _client = _async_client = None
+    if async_client is not None:
+        await async_client.close()
+    if client is not None:
+        client.close()
+
+
+def cache_key(messages: List[Dict[str, str]]) -> str:
+    """
+    Compute a content-addressed key for a list of chat messages.
+
+    Args:
+        messages: Chat messages sent to the model
+
+    Returns:
+        Hex sha256 digest of the serialized messages
+    """
+    payload = json.dumps(messages, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_answer(key: str) -> Optional[str]:
+    """Return the cached answer for a key, if it is still fresh."""
+    if ADVISOR_CACHE_TTL <= 0:
+        return None
+    with _resp_cache_lock:
+        return _RESP_CACHE.get(key)
+
+
+def set_cached_answer(key: str, answer: str) -> None:
+    """Store an answer string under a key."""
+    if ADVISOR_CACHE_TTL <= 0:
+        return
+    with _resp_cache_lock:
+        _RESP_CACHE[key] = answer
+
+
+def flush_cache() -> int:
+    """
+    Drop every cached advisory answer.
+
+    Returns:
+        Number of entries removed
+    """
+    with _resp_cache_lock:
+        size = len(_RESP_CACHE)
+        _RESP_CACHE.clear()
+    logger.info(f"Advisory response cache flushed ({size} entries)")
+    return size
+
+
+def complete(messages: List[Dict[str, str]]) -> Optional[str]:
+    """
+    Answer chat messages from the cache or through the shared client.
+
+    Args:
+        messages: Chat messages sent to the model
+
+    Returns:
+        Answer text, or None if the API call failed
+    """
+    key = cache_key(messages)
+    answer = get_cached_answer(key)
+    if answer is not None:
+        return answer
+    try:
+        response = get_client().chat.completions.create(messages=messages, **_COMPLETION_PARAMS)
+        answer = response.choices[0].message.content.strip()
+    except Exception as e:
+        logger.error(f"Error calling OpenAI API: {str(e)}")
+        return None
+    set_cached_answer(key, answer)
+    return answer
+
+
+async def acomplete(messages: List[Dict[str, str]]) -> Optional[str]:
+    """
+    Answer chat messages without blocking the event loop (see complete).
+
+    Args:
+        messages: Chat messages sent to the model
+
+    Returns:
+        Answer text, or None if the API call failed
+    """
+    key = cache_key(messages)
+    answer = get_cached_answer(key)
+    if answer is not None:
+        return answer
+    try:
+        response = await get_async_client().chat.completions.create(messages=messages, **_COMPLETION_PARAMS)
+        answer = response.choices[0].message.content.strip()
+    except Exception as e:
+        logger.error(f"Error calling OpenAI API: {str(e)}")
+        return None
+    set_cached_answer(key, answer)
+    return answer
+
+
+async def astream_complete(messages: List[Dict[str, str]], fallback_answer: str) -> AsyncIterator[str]:
+    """
+    Stream the answer to chat messages as it is generated.
+
+    The complete answer is cached once the stream finishes, so a repeated
+    prompt is served as a single fragment.
+
+    Args:
+        messages: Chat messages sent to the model
+        fallback_answer: Text yielded if the API call fails before any fragment arrived
+
+    Yields:
+        Fragments of the answer text
+    """
+    key = cache_key(messages)
+    answer = get_cached_answer(key)
+    if answer is not None:
+        yield answer
+        return
+
+    parts = []
+    try:
+        stream = await get_async_client().chat.completions.create(
+            messages=messages, stream=True, **_COMPLETION_PARAMS
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+    except Exception as e:
+        logger.error(f"Error calling OpenAI API: {str(e)}")
+        if not parts:
+            yield fallback_answer
+        return
+
+    set_cached_answer(key, "".join(parts).strip())
@@ -1,13 +1,55 @@
 # risk_assessment.py
+import io
+import math
+import csv
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
 from enum import Enum
-import json
+import orjson
+from bisect import bisect_right
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+try:
+    from numba import njit
+except ImportError:  # fall back to NumPy reductions without numba
+    njit = None
 from core.db_manager import get_db_cursor
+from core.database import execute_prepared
 from core.financial_models import RiskLevel
 
 logger = logging.getLogger(__name__)
 
+# Compiled coefficient-of-variation kernel: the AOT extension built from
+# ai/_risk_kernels.py if present, else a cached JIT build of the same source
+try:
+    from ai.risk_kernels import welford_cv as _welford_cv
+except ImportError:
+    from ai._risk_kernels import WELFORD_CV_SIGNATURE, welford_cv as _welford_cv
+    _welford_cv = njit(WELFORD_CV_SIGNATURE, cache=True)(_welford_cv) if njit is not None else None
+
+def _income_stability(income_history: List[float]) -> float:
+    """Stability score between 0 and 1 from the coefficient of variation of incomes."""
+    arr = np.ascontiguousarray(income_history, dtype=np.float64).reshape(-1)
+    if arr.size < 2:
+        return 0.5  # Default to medium stability
+
+    # Calculate coefficient of variation (lower is more stable)
+    if _welford_cv is not None:
+        cv = _welford_cv(arr)
+    else:
+        mean = arr.mean()
+        if mean <= 0:
+            return 0.0
+        cv = arr.std() / mean
+
+    # Convert to stability score (0-1)
+    # CV of 0 means perfect stability (1.0)
+    # CV of 0.5+ means high instability (0.0)
+    return max(0.0, 1.0 - float(cv) * 2)
+
 class RiskFactor(str, Enum):
     """Risk factors used in risk assessment."""
     INCOME_STABILITY = "income_stability"
@@ -21,23 +63,145 @@ class RiskFactor(str, Enum):
     INCOME_LEVEL = "income_level"
     NET_WORTH = "net_worth"
 
+# Positions of each factor in RiskFactor order, used to index score/weight vectors
+(_INCOME_STABILITY, _DEBT_RATIO, _EMERGENCY_FUND, _INVESTMENT_HORIZON, _AGE,
+ _DEPENDENTS, _MARKET_CONDITIONS, _INVESTMENT_EXPERIENCE, _INCOME_LEVEL, _NET_WORTH) = range(len(RiskFactor))
+
+# Vectorized factor calculators for calculate_risk_scores_batch. Each mirrors the
+# matching block of calculate_risk_score; NaN inputs count as missing (score 50).
+def _debt_ratio_scores(total_debt: np.ndarray, annual_income: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(total_debt) & (annual_income > 0)
+    ratio = total_debt / np.where(valid, annual_income, 1.0)
+    return np.where(valid, np.maximum(0, 100 - ratio * 100), 50.0)
+
+def _emergency_fund_scores(current_savings: np.ndarray, monthly_expenses: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(current_savings) & (monthly_expenses > 0)
+    months_covered = current_savings / np.where(valid, monthly_expenses, 1.0)
+    return np.where(valid, np.minimum(100, (months_covered / 6) * 100), 50.0)
+
+def _investment_horizon_scores(years: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(years), 50.0, np.minimum(100, (years / 20) * 100))
+
+def _age_scores(age: np.ndarray) -> np.ndarray:
+    adult = np.maximum(0, 100 - ((age - 18) / 62) * 100)
+    return np.where(np.isnan(age), 50.0, np.where(age < 18, 0.0, adult))
+
+# Scalar factor calculators for calculate_risk_score. Each receives the inputs
+# named in _FACTOR_TABLE (never None) and returns None when they cannot be scored.
+def _income_stability_score(income_history: List[float]) -> float:
+    return _income_stability(income_history) * 100  # Convert to 0-100 scale
+
+def _debt_ratio_score(total_debt: float, annual_income: float) -> Optional[float]:
+    if annual_income <= 0:
+        return None
+    return max(0, 100 - (total_debt / annual_income * 100))  # Lower debt ratio is better
+
+def _emergency_fund_score(current_savings: float, monthly_expenses: float) -> Optional[float]:
+    if monthly_expenses <= 0:
+        return None
+    # 6+ months of expenses covered is ideal (100), 0 months is poor (0)
+    return min(100, (current_savings / monthly_expenses / 6) * 100)
+
+def _investment_horizon_score(years: float) -> float:
+    return min(100, (years / 20) * 100)  # 0-1 year (0), 20+ years (100)
+
+def _age_score(age: float) -> float:
+    if age < 18:
+        return 0  # Special case for minors
+    return max(0, 100 - ((age - 18) / 62) * 100)  # 18 (100), 80+ (0)
+
+# (factor index, input keys, calculator, score used when an input is missing)
+_FACTOR_TABLE = (
+    (_INCOME_STABILITY, ("income_history",), _income_stability_score, 50.0),
+    (_DEBT_RATIO, ("total_debt", "annual_income"), _debt_ratio_score, 50.0),
+    (_EMERGENCY_FUND, ("current_savings", "monthly_expenses"), _emergency_fund_score, 50.0),
+    (_INVESTMENT_HORIZON, ("investment_horizon",), _investment_horizon_score, 50.0),
+    (_AGE, ("age",), _age_score, 50.0),
+)
+
+# Factors calculate_risk_score currently assesses
+_ASSESSED_FACTORS = tuple(entry[0] for entry in _FACTOR_TABLE)
+
+# Score thresholds between consecutive risk levels (a score equal to a threshold maps up)
+_THRESHOLDS = (20.0, 40.0, 60.0, 80.0)
+_LEVELS = (RiskLevel.VERY_LOW, RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.VERY_HIGH)
+
+@lru_cache(maxsize=128)
+def _level_for_bucket(bucket: int) -> RiskLevel:
+    """Risk level for a whole-number score; thresholds are integers, so this matches the exact score."""
+    return _LEVELS[bisect_right(_THRESHOLDS, bucket)]
+
+def _dumps(value: Any) -> str:
+    """Serialize to a JSON string with orjson (enum and other non-str keys allowed)."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def _risk_profile_json(risk_score: float, risk_level: str, factor_scores: Dict[str, float]) -> str:
+    """
+    Serialize a risk assessment for the risk_profile JSONB column.
+    
+    Factor scores are stored as whole numbers (0-100) and the overall score with
+    two decimals; finer precision never changes the risk bucket.
+    """
+    return _dumps({
+        "score": round(float(risk_score), 2),
+        "level": risk_level,
+        "factor_scores": {factor: int(round(value)) for factor, value in factor_scores.items()},
+        "updated_at": "NOW()"
+    })
+
+# Prepared once per connection (execute_prepared), hence the $n placeholders
+_SQL_UPSERT_RISK_PROFILE = """
+    INSERT INTO user_profiles (user_id, risk_profile, updated_at)
+    VALUES ($1, $2, NOW())
+    ON CONFLICT (user_id) DO UPDATE SET
+        risk_profile = EXCLUDED.risk_profile,
+        updated_at = NOW()
+"""
+
+_SQL_GET_RISK_PROFILE = "SELECT risk_profile FROM user_profiles WHERE user_id = $1"
+
+# Risk profile keys get_user_risk_profile can project server-side, with the SQL
+# expression template each is extracted by ({} is the quoted JSON key)
+_RISK_PROFILE_FIELDS = {
+    "score": "(risk_profile->>{})::float",
+    "level": "risk_profile->>{}",
+    "factor_scores": "risk_profile->{}",
+    "updated_at": "risk_profile->>{}",
+}
+
+_SQL_BULK_UPSERT_RISK_PROFILES = """
+    INSERT INTO user_profiles (user_id, risk_profile, updated_at)
+    VALUES %s
+    ON CONFLICT (user_id) DO UPDATE SET
+        risk_profile = EXCLUDED.risk_profile,
+        updated_at = NOW()
+"""
+
+# Batches at least this large are streamed with COPY into a temp table and merged
+_BULK_COPY_THRESHOLD = 10000
+
 class RiskAssessmentService:
     """Centralized service for risk assessment across all modules."""
     
     def __init__(self):
         """Initialize the risk assessment service."""
         self.risk_factors = {
-            RiskFactor.INCOME_STABILITY: 0.15,
-            RiskFactor.DEBT_RATIO: 0.15,
-            RiskFactor.EMERGENCY_FUND: 0.15,
-            RiskFactor.INVESTMENT_HORIZON: 0.15,
-            RiskFactor.AGE: 0.10,
-            RiskFactor.DEPENDENTS: 0.05,
-            RiskFactor.MARKET_CONDITIONS: 0.10,
-            RiskFactor.INVESTMENT_EXPERIENCE: 0.05,
-            RiskFactor.INCOME_LEVEL: 0.05,
-            RiskFactor.NET_WORTH: 0.05
+            "income_stability": 0.15,
+            "debt_ratio": 0.15,
+            "emergency_fund": 0.15,
+            "investment_horizon": 0.15,
+            "age": 0.10,
+            "dependents": 0.05,
+            "market_conditions": 0.10,
+            "investment_experience": 0.05,
+            "income_level": 0.05,
+            "net_worth": 0.05
         }
+        # Plain string keys (RiskFactor values) avoid enum hashing and encoder fallbacks
+        self._factor_order = [factor.value for factor in RiskFactor]
+        self._weights_arr = np.array([self.risk_factors[f] for f in self._factor_order], dtype=np.float64)
+        self._assessed_idx = np.array(_ASSESSED_FACTORS)
+        self._assessed_keys = [self._factor_order[i] for i in _ASSESSED_FACTORS]
     
     def calculate_risk_score(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -49,78 +213,18 @@ class RiskAssessmentService:
         Returns:
             Dictionary with risk score, risk level, and factor contributions
         """
-        score = 0
-        factor_scores = {}
-        
-        # Income stability (higher is better)
-        if "income_history" in user_data:
-            stability = self._calculate_income_stability(user_data["income_history"])
-            factor_score = stability * 100  # Convert to 0-100 scale
-            score += factor_score * self.risk_factors[RiskFactor.INCOME_STABILITY]
-            factor_scores[RiskFactor.INCOME_STABILITY] = factor_score
-        else:
-            # Default to medium stability if no history
-            factor_score = 50
-            score += factor_score * self.risk_factors[RiskFactor.INCOME_STABILITY]
-            factor_scores[RiskFactor.INCOME_STABILITY] = factor_score
-        
-        # Debt ratio (lower is better)
-        if "total_debt" in user_data and "annual_income" in user_data and user_data["annual_income"] > 0:
-            debt_ratio = user_data["total_debt"] / user_data["annual_income"]
-            factor_score = max(0, 100 - (debt_ratio * 100))  # Convert to 0-100 scale (inverse)
-            score += factor_score * self.risk_factors[RiskFactor.DEBT_RATIO]
-            factor_scores[RiskFactor.DEBT_RATIO] = factor_score
-        else:
-            # Default to medium debt ratio if missing data
-            factor_score = 50
-            score += factor_score * self.risk_factors[RiskFactor.DEBT_RATIO]
-            factor_scores[RiskFactor.DEBT_RATIO] = factor_score
+        # Per-factor scores in RiskFactor order; factors not assessed yet stay 0
+        scores = np.zeros(len(self._factor_order))
         
-        # Emergency fund (higher is better)
-        if "current_savings" in user_data and "monthly_expenses" in user_data and user_data["monthly_expenses"] > 0:
-            # Calculate months of expenses covered by savings
-            months_covered = user_data["current_savings"] / user_data["monthly_expenses"]
-            # 6+ months is ideal (100), 0 months is poor (0)
-            factor_score = min(100, (months_covered / 6) * 100)
-            score += factor_score * self.risk_factors[RiskFactor.EMERGENCY_FUND]
-            factor_scores[RiskFactor.EMERGENCY_FUND] = factor_score
-        else:
-            # Default to medium emergency fund if missing data
-            factor_score = 50
-            score += factor_score * self.risk_factors[RiskFactor.EMERGENCY_FUND]
-            factor_scores[RiskFactor.EMERGENCY_FUND] = factor_score
-        
-        # Investment horizon (longer is higher risk tolerance)
-        if "investment_horizon" in user_data:
-            # Convert years to score: 0-1 year (0), 20+ years (100)
-            years = user_data["investment_horizon"]
-            factor_score = min(100, (years / 20) * 100)
-            score += factor_score * self.risk_factors[RiskFactor.INVESTMENT_HORIZON]
-            factor_scores[RiskFactor.INVESTMENT_HORIZON] = factor_score
-        else:
-            # Default to medium investment horizon if missing data
-            factor_score = 50
-            score += factor_score * self.risk_factors[RiskFactor.INVESTMENT_HORIZON]
-            factor_scores[RiskFactor.INVESTMENT_HORIZON] = factor_score
+        # One pass over the factor table; a missing or None input gives the medium default
+        get = user_data.get
+        for idx, keys, calculate, default in _FACTOR_TABLE:
+            args = [get(key) for key in keys]
+            value = None if any(arg is None for arg in args) else calculate(*args)
+            scores[idx] = default if value is None else value
         
-        # Age (younger is higher risk tolerance)
-        if "age" in user_data:
-            # Convert age to score: 18 (100), 80+ (0)
-            age = user_data["age"]
-            if age < 18:
-                factor_score = 0  # Special case for minors
-            else:
-                factor_score = max(0, 100 - ((age - 18) / 62) * 100)
-            score += factor_score * self.risk_factors[RiskFactor.AGE]
-            factor_scores[RiskFactor.AGE] = factor_score
-        else:
-            # Default to medium age if missing data
-            factor_score = 50
-            score += factor_score * self.risk_factors[RiskFactor.AGE]
-            factor_scores[RiskFactor.AGE] = factor_score
-        
-        # Calculate remaining factors...
-        # (Similar calculations for dependents, market conditions, etc.)
+        score = float(scores @ self._weights_arr)
+        factor_scores = dict(zip(self._assessed_keys, scores[self._assessed_idx].tolist()))
         
         # Map score to risk level
         risk_level = self.map_to_risk_level(score)
@@ -136,6 +240,57 @@ class RiskAssessmentService:
             "factor_weights": self.risk_factors
         }
     
+    def calculate_risk_scores_batch(self, data: Union[pd.DataFrame, Dict[str, Any]], save: bool = True) -> pd.DataFrame:
+        """
+        Calculate risk scores for many users at once.
+        
+        Applies the same rules as calculate_risk_score column-wise; missing
+        columns or NaN values fall back to the medium (50) factor score.
+        
+        Args:
+            data: DataFrame (or mapping of column name to array) with one row per user
+            save: Whether to persist the results when a user_id column is present
+            
+        Returns:
+            DataFrame with risk_score, risk_level and one column per assessed factor
+        """
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        n_users = len(df)
+        
+        def column(name: str) -> np.ndarray:
+            if name in df:
+                return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+            return np.full(n_users, np.nan)
+        
+        S = np.zeros((n_users, len(self._factor_order)))
+        if "income_history" in df:
+            S[:, _INCOME_STABILITY] = [self._calculate_income_stability(h) * 100 for h in df["income_history"]]
+        else:
+            S[:, _INCOME_STABILITY] = 50
+        S[:, _DEBT_RATIO] = _debt_ratio_scores(column("total_debt"), column("annual_income"))
+        S[:, _EMERGENCY_FUND] = _emergency_fund_scores(column("current_savings"), column("monthly_expenses"))
+        S[:, _INVESTMENT_HORIZON] = _investment_horizon_scores(column("investment_horizon"))
+        S[:, _AGE] = _age_scores(column("age"))
+        
+        scores = S @ self._weights_arr
+        levels = [level.value for level in self.map_to_risk_levels(scores)]
+        
+        result = pd.DataFrame(S[:, self._assessed_idx], columns=self._assessed_keys, index=df.index)
+        result.insert(0, "risk_score", scores)
+        result.insert(1, "risk_level", levels)
+        
+        if "user_id" in df:
+            result.insert(0, "user_id", df["user_id"].to_numpy())
+            if save:
+                self.save_risk_assessments_bulk([
+                    (user_id, score, level, dict(zip(self._assessed_keys, factors)))
+                    for user_id, score, level, factors in zip(
+                        result["user_id"].tolist(), scores.tolist(), levels, S[:, self._assessed_idx].tolist()
+                    )
+                ])
+        
+        return result
+    
     def _calculate_income_stability(self, income_history: List[float]) -> float:
         """
         Calculate income stability from income history.
@@ -146,21 +301,7 @@ class RiskAssessmentService:
         Returns:
             Stability score between 0 and 1
         """
-        if not income_history or len(income_history) < 2:
-            return 0.5  # Default to medium stability
-        
-        # Calculate coefficient of variation (lower is more stable)
-        mean = sum(income_history) / len(income_history)
-        variance = sum((x - mean) ** 2 for x in income_history) / len(income_history)
-        std_dev = variance ** 0.5
-        cv = std_dev / mean if mean > 0 else float('inf')
-        
-        # Convert to stability score (0-1)
-        # CV of 0 means perfect stability (1.0)
-        # CV of 0.5+ means high instability (0.0)
-        stability = max(0, 1 - (cv * 2))
-        
-        return stability
+        return _income_stability(income_history)
     
     def map_to_risk_level(self, score: float) -> RiskLevel:
         """
@@ -172,16 +313,23 @@ class RiskAssessmentService:
         Returns:
             RiskLevel enum value
         """
-        if score < 20:
-            return RiskLevel.VERY_LOW
-        elif score < 40:
-            return RiskLevel.LOW
-        elif score < 60:
-            return RiskLevel.MEDIUM
-        elif score < 80:
-            return RiskLevel.HIGH
-        else:
-            return RiskLevel.VERY_HIGH
+        if not math.isfinite(score):
+            # NaN and ±inf get the level of the plain comparison chain (NaN -> VERY_HIGH)
+            return _LEVELS[bisect_right(_THRESHOLDS, score)]
+        return _level_for_bucket(math.floor(score))
+    
+    def map_to_risk_levels(self, scores: np.ndarray) -> List[RiskLevel]:
+        """
+        Map an array of numerical scores to risk levels in one pass.
+        
+        Args:
+            scores: Risk scores between 0 and 100
+            
+        Returns:
+            List of RiskLevel enum values, one per score
+        """
+        indices = np.searchsorted(_THRESHOLDS, np.asarray(scores, dtype=np.float64), side="right")
+        return [_LEVELS[i] for i in indices.tolist()]
     
     def save_risk_assessment(self, user_id: int, risk_score: float, risk_level: str, factor_scores: Dict[str, float]):
         """
@@ -195,64 +343,114 @@ class RiskAssessmentService:
         """
         try:
             with get_db_cursor() as cursor:
-                # Check if user profile exists
-                cursor.execute(
-                    "SELECT id FROM user_profiles WHERE user_id = %s",
-                    (user_id,)
-                )
-                result = cursor.fetchone()
-                
-                risk_data = {
-                    "score": risk_score,
-                    "level": risk_level,
-                    "factor_scores": factor_scores,
-                    "updated_at": "NOW()"
-                }
-                
-                if result:
-                    # Update existing profile
-                    cursor.execute(
-                        """
-                        UPDATE user_profiles 
-                        SET risk_profile = %s, updated_at = NOW()
-                        WHERE user_id = %s
-                        """,
-                        (json.dumps(risk_data), user_id)
-                    )
-                else:
-                    # Create new profile
-                    cursor.execute(
-                        """
-                        INSERT INTO user_profiles (user_id, risk_profile, updated_at)
-                        VALUES (%s, %s, NOW())
-                        """,
-                        (user_id, json.dumps(risk_data))
-                    )
+                # Single roundtrip: create the profile or update its risk part
+                execute_prepared(cursor, "risk_upsert_profile", _SQL_UPSERT_RISK_PROFILE,
+                                 (user_id, _risk_profile_json(risk_score, risk_level, factor_scores)))
                 
                 logger.info(f"Risk assessment saved for user {user_id}")
         except Exception as e:
             logger.error(f"Error saving risk assessment: {str(e)}")
     
-    def get_user_risk_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
+    def save_risk_assessments_bulk(self, assessments: List[Tuple[int, float, str, Dict[str, float]]]) -> int:
+        """
+        Save many risk assessments in one transaction.
+        
+        Args:
+            assessments: List of (user_id, risk_score, risk_level, factor_scores) tuples
+            
+        Returns:
+            Number of profiles written
+        """
+        # One row per user (last assessment wins); ON CONFLICT cannot touch a row twice
+        rows = {}
+        for user_id, risk_score, risk_level, factor_scores in assessments:
+            rows[user_id] = _risk_profile_json(risk_score, risk_level, factor_scores)
+        
+        if not rows:
+            return 0
+        
+        try:
+            with get_db_cursor() as cursor:
+                if len(rows) >= _BULK_COPY_THRESHOLD:
+                    self._copy_risk_profiles(cursor, rows)
+                else:
+                    execute_values(
+                        cursor, _SQL_BULK_UPSERT_RISK_PROFILES, list(rows.items()),
+                        template="(%s, %s, NOW())", page_size=1000
+                    )
+            logger.info(f"Risk assessments saved for {len(rows)} users")
+            return len(rows)
+        except Exception as e:
+            logger.error(f"Error saving risk assessments in bulk: {str(e)}")
+            return 0
+    
+    def _copy_risk_profiles(self, cursor, rows: Dict[int, str]):
+        """
+        Stream risk profiles into a temp table with COPY and merge them in one statement.
+        
+        Args:
+            cursor: Open database cursor
+            rows: Mapping of user ID to serialized risk profile
+        """
+        cursor.execute(
+            "CREATE TEMP TABLE tmp_risk_profiles (user_id INTEGER, risk_profile JSONB) ON COMMIT DROP"
+        )
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows.items())
+        buffer.seek(0)
+        cursor.copy_expert(
+            "COPY tmp_risk_profiles (user_id, risk_profile) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+        cursor.execute(
+            """
+            INSERT INTO user_profiles (user_id, risk_profile, updated_at)
+            SELECT user_id, risk_profile, NOW() FROM tmp_risk_profiles
+            ON CONFLICT (user_id) DO UPDATE SET
+                risk_profile = EXCLUDED.risk_profile,
+                updated_at = NOW()
+            """
+        )
+    
+    def get_user_risk_profile(self, user_id: int, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         Get user's risk profile from database.
         
         Args:
             user_id: User ID
+            fields: Optional subset of profile keys (score, level, factor_scores,
+                updated_at) to project in the database instead of the whole profile
             
         Returns:
-            Risk profile dictionary or None if not found
+            Risk profile dictionary (restricted to fields if given) or None if not found;
+            factor scores are integers 0-100
         """
+        if fields is not None:
+            unknown = set(fields) - _RISK_PROFILE_FIELDS.keys()
+            if unknown:
+                raise ValueError(f"Unknown risk profile fields: {sorted(unknown)}")
+        
         try:
             with get_db_cursor(commit=False) as cursor:
-                cursor.execute(
-                    "SELECT risk_profile FROM user_profiles WHERE user_id = %s",
-                    (user_id,)
+                if fields is None:
+                    execute_prepared(cursor, "risk_get_profile", _SQL_GET_RISK_PROFILE, (user_id,))
+                    result = cursor.fetchone()
+                    
+                    # JSONB arrives already decoded (JsonbConnection in core.database)
+                    if result and result[0]:
+                        return result[0]
+                    return None
+                
+                fields = list(dict.fromkeys(fields))
+                query = sql.SQL("SELECT {} FROM user_profiles WHERE user_id = %s AND risk_profile IS NOT NULL").format(
+                    sql.SQL(", ").join(
+                        sql.SQL(_RISK_PROFILE_FIELDS[field]).format(sql.Literal(field)) for field in fields
+                    )
                 )
+                cursor.execute(query, (user_id,))
                 result = cursor.fetchone()
                 
-                if result and result[0]:
-                    return result[0]
+                if result:
+                    return dict(zip(fields, result))
                 return None
         except Exception as e:
             logger.error(f"Error retrieving risk profile: {str(e)}")
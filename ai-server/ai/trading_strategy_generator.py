@@ -1,57 +1,65 @@
 import os
+import asyncio
 import logging
-import openai
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, AsyncIterator
+from cachetools import TTLCache
 from core.financial_models import AdvisoryRequest, AdvisoryResponse
+from ai.llm_client import get_async_client
 
 logger = logging.getLogger(__name__)
 
-# Set OpenAI API key from environment variable
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# Upper bound on concurrent OpenAI calls made by generate_strategies
+STRATEGY_MAX_CONCURRENCY = int(os.getenv("STRATEGY_MAX_CONCURRENCY", "8"))
+
+# Answers are cached per normalized question; bump when the prompts change
+STRATEGY_CACHE_TTL = int(os.getenv("STRATEGY_CACHE_TTL", "3600"))
+_PROMPT_VERSION = 1
+
+# System prompts per language (anything other than Polish gets English)
+_PROMPTS = {
+    "pl": (
+        "Jesteś asystentem inwestycyjnym specjalizującym się w tworzeniu"
+        " strategii tradingowych. Odpowiadaj konkretnie i podawaj kroki"
+        " do wykonania."
+    ),
+    "en": (
+        "You are an investment assistant specializing in building"
+        " trading strategies. Provide concise steps and clear logic."
+    ),
+}
 
 class TradingStrategyGenerator:
     """Generate trading strategies using OpenAI models."""
 
     def __init__(self):
+        self._cache = TTLCache(maxsize=2048, ttl=STRATEGY_CACHE_TTL)
         logger.info("TradingStrategyGenerator initialized")
 
-    def generate_strategy(self, request: AdvisoryRequest) -> AdvisoryResponse:
+    async def generate_strategy(self, request: AdvisoryRequest) -> AdvisoryResponse:
         """Generate a trading strategy based on the request."""
         user_id = request.user_id
         question = request.question
         context = request.context or {}
         language = request.language or "en"
 
-        # Prepare system prompt
-        if language == "pl":
-            prompt = (
-                "Jesteś asystentem inwestycyjnym specjalizującym się w tworzeniu"
-                " strategii tradingowych. Odpowiadaj konkretnie i podawaj kroki"
-                " do wykonania."
-            )
-        else:
-            prompt = (
-                "You are an investment assistant specializing in building"
-                " trading strategies. Provide concise steps and clear logic."
-            )
+        messages = self._build_messages(question, language)
 
-        messages = [
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": question}
-        ]
-
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1000
-            )
-            answer = response.choices[0].message["content"].strip()
-        except Exception as e:
-            logger.error(f"OpenAI error: {e}")
-            answer = "Unable to generate strategy at this time."
+        cache_key = self._cache_key(question, language)
+        answer = self._cache.get(cache_key)
+        if answer is None:
+            try:
+                response = await get_async_client().chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=1000
+                )
+                answer = response.choices[0].message.content.strip()
+                self._cache[cache_key] = answer
+            except Exception as e:
+                logger.error(f"OpenAI error: {e}")
+                answer = "Unable to generate strategy at this time."
 
         return AdvisoryResponse(
             user_id=user_id,
@@ -63,4 +71,58 @@ class TradingStrategyGenerator:
             disclaimer="For educational purposes only.",
             created_at=datetime.now(),
             additional_resources=None,
-        )
\ No newline at end of file
+        )
+
+    async def stream_strategy(self, request: AdvisoryRequest) -> AsyncIterator[str]:
+        """Yield the strategy text as it is generated; the full answer is cached at the end."""
+        language = request.language or "en"
+        cache_key = self._cache_key(request.question, language)
+        answer = self._cache.get(cache_key)
+        if answer is not None:
+            yield answer
+            return
+
+        parts = []
+        try:
+            stream = await get_async_client().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=self._build_messages(request.question, language),
+                temperature=0.7,
+                max_tokens=1000,
+                stream=True
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            logger.error(f"OpenAI error: {e}")
+            if not parts:
+                yield "Unable to generate strategy at this time."
+            return
+
+        self._cache[cache_key] = "".join(parts).strip()
+
+    @staticmethod
+    def _build_messages(question: str, language: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": _PROMPTS.get(language, _PROMPTS["en"])},
+            {"role": "user", "content": question}
+        ]
+
+    @staticmethod
+    def _cache_key(question: str, language: str) -> tuple:
+        return (question.strip().lower(), language, _PROMPT_VERSION)
+
+    async def generate_strategies(self, requests: List[AdvisoryRequest]) -> List[AdvisoryResponse]:
+        """Generate strategies for several requests concurrently, in request order."""
+        semaphore = asyncio.Semaphore(STRATEGY_MAX_CONCURRENCY)
+
+        async def bounded(request: AdvisoryRequest) -> AdvisoryResponse:
+            async with semaphore:
+                return await self.generate_strategy(request)
+
+        return await asyncio.gather(*(bounded(request) for request in requests))
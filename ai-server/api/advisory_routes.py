@@ -3,9 +3,11 @@ API routes for financial and investment advisory services.
 This module provides FastAPI endpoints for financial, legal, tax, and investment advisory.
 """
 
+import json
 import logging
 from typing import Dict, List, Optional, Any
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 # Import your database connection
@@ -54,7 +56,7 @@ async def get_financial_advice(
     """
     try:
         logger.info(f"Processing financial advisory request for user {request.user_id}")
-        response = financial_advisor.process_advisory_request(request)
+        response = await financial_advisor.aprocess_advisory_request(request)
         return response
     except Exception as e:
         logger.error(f"Error processing financial advisory request: {e}")
@@ -194,12 +196,12 @@ async def chat_with_advisor(
         
         # Route to appropriate advisor based on advisory type
         if request.advisory_type in ["financial", "legal", "tax"]:
-            response = financial_advisor.process_advisory_request(request)
+            response = await financial_advisor.aprocess_advisory_request(request)
         elif request.advisory_type in ["investment", "portfolio"]:
-            response = investment_advisor.process_advisory_request(request)
+            response = await investment_advisor.aprocess_advisory_request(request)
         else:
             # Default to financial advisor for general questions
-            response = financial_advisor.process_advisory_request(request)
+            response = await financial_advisor.aprocess_advisory_request(request)
         
         return response
     except Exception as e:
@@ -208,3 +210,32 @@ async def chat_with_advisor(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error processing chat request"
         )
+
+
+@router.post("/chat/stream")
+async def stream_chat_with_advisor(request: AdvisoryRequest):
+    """
+    Chat with AI financial advisor, streaming the answer as server-sent events.
+    
+    Each event carries a JSON object with the next answer fragment under
+    "delta"; a final "done" event marks the end of the answer.
+    
+    Args:
+        request: Advisory request with question and context
+        
+    Returns:
+        StreamingResponse with text/event-stream content
+    """
+    logger.info(f"Processing streaming chat request for user {request.user_id}")
+    
+    if request.advisory_type in ["investment", "portfolio"]:
+        advisor = investment_advisor
+    else:
+        advisor = financial_advisor
+    
+    async def event_stream():
+        async for delta in advisor.astream_advisory_request(request):
+            yield f"data: {json.dumps({'delta': delta}, ensure_ascii=False)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -612,11 +612,11 @@ async def financial_chat(request: FinancialChatRequest):
                 )
                 
                 if request.advisory_type in ["financial", "legal", "tax"]:
-                    response = financial_advisor.process_advisory_request(advisory_request)
+                    response = await financial_advisor.aprocess_advisory_request(advisory_request)
                 elif request.advisory_type in ["investment", "portfolio"]:
-                    response = investment_advisor.process_advisory_request(advisory_request)
+                    response = await investment_advisor.aprocess_advisory_request(advisory_request)
                 else:
-                    response = financial_advisor.process_advisory_request(advisory_request)
+                    response = await financial_advisor.aprocess_advisory_request(advisory_request)
                 
                 ai_response = response.answer
                 model_used = f"local_{request.advisory_type}"
@@ -631,11 +631,11 @@ async def financial_chat(request: FinancialChatRequest):
             )
             
             if request.advisory_type in ["financial", "legal", "tax"]:
-                response = financial_advisor.process_advisory_request(advisory_request)
+                response = await financial_advisor.aprocess_advisory_request(advisory_request)
             elif request.advisory_type in ["investment", "portfolio"]:
-                response = investment_advisor.process_advisory_request(advisory_request)
+                response = await investment_advisor.aprocess_advisory_request(advisory_request)
             else:
-                response = financial_advisor.process_advisory_request(advisory_request)
+                response = await financial_advisor.aprocess_advisory_request(advisory_request)
             
             ai_response = response.answer
             model_used = f"local_{request.advisory_type}"
@@ -3,11 +3,12 @@ Endpoint API dla drzewa decyzyjnego - łączy frontend z modelem drzewa decyzyjn
 i routerami FastAPI.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Body
+from fastapi import APIRouter, HTTPException, Depends, Body, Response
 from typing import Dict, Any, List
 from datetime import datetime
 import logging
 import json
+import orjson
 
 from ai.tree_model import (
     FinancialDecisionTree, 
@@ -83,7 +84,7 @@ async def process_decision_tree(request_data: Dict[str, Any] = Body(...)):
         
         # Jeśli mamy rekomendacje, dodaj je do odpowiedzi
         if response.recommendations:
-            result["recommendations"] = [rec.dict() for rec in response.recommendations]
+            result["recommendations"] = [rec.response_payload for rec in response.recommendations]
             result["completed"] = True
         else:
             result["completed"] = False
@@ -92,7 +93,7 @@ async def process_decision_tree(request_data: Dict[str, Any] = Body(...)):
         if response.messages:
             result["messages"] = response.messages
         
-        return result
+        return _json_response(result)
     
     except Exception as e:
         logger.error(f"Błąd przetwarzania kroku drzewa decyzyjnego: {e}")
@@ -239,7 +240,7 @@ async def get_next_question(request_data: Dict[str, Any] = Body(...)):
         
         # Jeśli to węzeł rekomendacji, dodaj rekomendacje
         if response.node.type == "recommendation" and response.recommendations:
-            result["recommendations"] = [rec.dict() for rec in response.recommendations]
+            result["recommendations"] = [rec.response_payload for rec in response.recommendations]
             result["completed"] = True
         else:
             result["completed"] = False
@@ -248,7 +249,7 @@ async def get_next_question(request_data: Dict[str, Any] = Body(...)):
         if response.messages:
             result["messages"] = response.messages
         
-        return result
+        return _json_response(result)
         
     except Exception as e:
         logger.error(f"Błąd pobierania następnego pytania: {e}")
@@ -458,6 +459,13 @@ def _generate_fallback_initial_options(advisor_id: str, goal_type: str) -> List[
         ]
 
 # Helper functions
+def _json_response(result: Dict[str, Any]) -> Response:
+    """
+    Serializuje odpowiedź drzewa decyzyjnego przez orjson, z pominięciem kodera FastAPI.
+    Rekomendacje są już gotowymi (współdzielonymi) słownikami, więc zostaje tylko zapis JSON.
+    """
+    return Response(content=orjson.dumps(result), media_type="application/json")
+
 def _map_goal_to_advisor_type(goal_type: str) -> str:
     """Mapuje typ celu na typ doradcy."""
     mapping = {
@@ -46,7 +46,7 @@ async def get_specialized_advice(data: SpecializedAdviceRequest, db: Session = D
         )
         
         if data.advisory_type in ["investment", "portfolio"]:
-            response = investment_advisor.process_advisory_request(advisory_request)
+            response = await investment_advisor.aprocess_advisory_request(advisory_request)
         elif data.advisory_type == "legal":
             response = financial_advisor.generate_legal_advice(
                 data.question, jurisdiction=data.context.get("jurisdiction", "default")
@@ -54,7 +54,7 @@ async def get_specialized_advice(data: SpecializedAdviceRequest, db: Session = D
         elif data.advisory_type == "tax":
             response = financial_advisor.generate_tax_advice(advisory_request)
         else:
-            response = financial_advisor.process_advisory_request(advisory_request)
+            response = await financial_advisor.aprocess_advisory_request(advisory_request)
         
         # Używamy getattr, aby sprawdzić, czy recommendations istnieje; jeśli nie – ustawiamy None
         return SpecializedAdviceResponse(
@@ -1,4 +1,6 @@
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, Any
 from ai.trading_strategy_generator import TradingStrategyGenerator
@@ -23,6 +25,23 @@ async def generate_trading_strategy(data: TradingStrategyRequest):
             advisory_type="trading_strategy",
             language=data.language,
         )
-        return strategy_generator.generate_strategy(request)
+        return await strategy_generator.generate_strategy(request)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/trading-strategy/stream", tags=["Trading Strategy"])
+async def stream_trading_strategy(data: TradingStrategyRequest):
+    request = AdvisoryRequest(
+        user_id=data.user_id,
+        question=data.question,
+        context=data.context,
+        advisory_type="trading_strategy",
+        language=data.language,
+    )
+
+    async def event_stream():
+        async for delta in strategy_generator.stream_strategy(request):
+            yield f"data: {json.dumps({'delta': delta}, ensure_ascii=False)}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
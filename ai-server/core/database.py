@@ -1,8 +1,13 @@
 from typing import List, Dict, Optional
 import logging
 import os
+import threading
+import weakref
 from contextlib import contextmanager
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.extensions import connection as _PgConnection
+from psycopg2.extras import register_default_jsonb
+import orjson
 import psycopg2
 from dotenv import load_dotenv
 
@@ -18,33 +23,50 @@ logger.info(f"DB_USER: {os.getenv('DB_USER')}")
 logger.info(f"DB_PASSWORD: {os.getenv('DB_PASSWORD')}")
 logger.info(f"DB_PORT: {os.getenv('DB_PORT', '5432')}")
 
-# Globalna pula połączeń
+# Globalna pula połączeń (współdzielona między wątkami workerów FastAPI)
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '2'))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '32'))
 db_pool = None
+_db_pool_lock = threading.Lock()
+
+class JsonbConnection(_PgConnection):
+    """Połączenie, które dekoduje kolumny JSONB przez orjson (rejestracja tylko na tym połączeniu)."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        register_default_jsonb(self, loads=orjson.loads)
 
 def init_db_pool():
     """Inicjalizuje pulę połączeń do bazy danych."""
     global db_pool
     try:
-        db_pool = SimpleConnectionPool(
-            1, 10,
+        db_pool = ThreadedConnectionPool(
+            DB_POOL_MIN, DB_POOL_MAX,
             host=os.getenv('DB_HOST', 'localhost'),
             database=os.getenv('DB_NAME'),
             user=os.getenv('DB_USER'),
             password=os.getenv('DB_PASSWORD'),
-            port=os.getenv('DB_PORT', '5432')
+            port=os.getenv('DB_PORT', '5432'),
+            connection_factory=JsonbConnection
         )
         logger.info("Database connection pool initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing the database pool: {e}")
         raise Exception(f"Error initializing the database pool: {e}")
 
+def _ensure_db_pool():
+    """Inicjalizuje pulę przy pierwszym użyciu (bezpiecznie dla wielu wątków)."""
+    if db_pool is None:
+        with _db_pool_lock:
+            if db_pool is None:
+                init_db_pool()
+
 @contextmanager
 def get_db():
     """Pobiera połączenie z puli i zwraca je w kontekście."""
     connection = None
     try:
-        if db_pool is None:
-            raise Exception("Database pool is not initialized")
+        _ensure_db_pool()
         connection = db_pool.getconn()
         logger.debug("Obtained database connection from pool")
         yield connection
@@ -76,6 +98,81 @@ def get_db_cursor(commit: bool = True):
             cursor.close()
             logger.debug("Database cursor closed")
 
+# Połączenia przypięte do wątków (np. długo żyjących workerów zapisujących do bazy)
+_thread_local = threading.local()
+
+class _PinnedConnection:
+    """Połączenie z puli przypięte do wątku; wraca do puli, gdy wątek się kończy."""
+    
+    def __init__(self, connection):
+        self.connection = connection
+        self.release = weakref.finalize(self, _release_pinned_connection, connection)
+
+def _release_pinned_connection(connection, close: bool = False):
+    try:
+        if db_pool is not None:
+            db_pool.putconn(connection, close=close)
+    except Exception as e:
+        logger.warning(f"Error returning pinned connection to pool: {e}")
+
+def get_thread_connection():
+    """Zwraca połączenie przypięte do bieżącego wątku, pobierając je z puli przy pierwszym użyciu."""
+    pinned = getattr(_thread_local, "pinned", None)
+    if pinned is not None:
+        if pinned.connection.closed == 0:
+            return pinned.connection
+        # Zerwane połączenie: odłącz finalizer i oddaj je do zamknięcia
+        pinned.release.detach()
+        _release_pinned_connection(pinned.connection, close=True)
+        _thread_local.pinned = None
+    
+    _ensure_db_pool()
+    connection = db_pool.getconn()
+    _thread_local.pinned = _PinnedConnection(connection)
+    logger.debug("Pinned database connection to current thread")
+    return connection
+
+@contextmanager
+def get_thread_db_cursor(commit: bool = True):
+    """Zwraca kursor z połączenia przypiętego do wątku, automatycznie commit/rollback."""
+    connection = get_thread_connection()
+    cursor = connection.cursor()
+    try:
+        yield cursor
+        if commit:
+            connection.commit()
+        else:
+            # Nie zostawiaj otwartej transakcji na długo żyjącym połączeniu
+            connection.rollback()
+    except Exception as e:
+        connection.rollback()
+        logger.error(f"Database query error: {e}")
+        raise
+    finally:
+        cursor.close()
+
+# Nazwy prepared statements zarejestrowanych na każdym fizycznym połączeniu z puli
+_prepared_statements = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+
+def execute_prepared(cursor, name: str, sql: str, params: tuple = ()):
+    """
+    Wykonuje zapytanie jako prepared statement, przygotowując je raz na połączenie.
+    
+    sql używa placeholderów PREPARE ($1, $2, ...); parametry są przekazywane do EXECUTE.
+    """
+    connection = cursor.connection
+    with _prepared_lock:
+        prepared = _prepared_statements.setdefault(connection, set())
+    if name not in prepared:
+        cursor.execute(f"PREPARE {name} AS {sql}")
+        prepared.add(name)
+    if params:
+        placeholders = ", ".join(["%s"] * len(params))
+        cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+    else:
+        cursor.execute(f"EXECUTE {name}")
+
 def init_db():
     """Tworzy tabele w bazie jeśli nie istnieją."""
     init_db_pool()
@@ -3,6 +3,7 @@ import logging
 import psycopg2
 from psycopg2.pool import SimpleConnectionPool
 from contextlib import contextmanager
+from core.database import JsonbConnection
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +24,9 @@ def init_db_pool():
                 database=os.getenv('DB_NAME'),
                 user=os.getenv('DB_USER'),
                 password=os.getenv('DB_PASSWORD'),
-                port=os.getenv('DB_PORT', '5432')
+                port=os.getenv('DB_PORT', '5432'),
+                # JSONB columns arrive decoded by orjson, as in the core.database pool
+                connection_factory=JsonbConnection
             )
             logger.info("PostgreSQL connection pool initialized successfully")
         return db_pool
@@ -1,3 +1,4 @@
+import asyncio
 import time
 import logging
 import sys
@@ -31,6 +32,7 @@ from ai.tree_model import TreeModel
 from ai.financial_advisor import FinancialLegalAdvisor
 from ai.investment_advisor import InvestmentAdvisor
 from ai.ai_chat_selector import AIChatSelector
+from ai.llm_client import aclose_clients
 from api.chat import chat_router
 from api.auth import auth_router
 from api.decision_tree import router as decision_tree_router
@@ -156,6 +158,16 @@ app.include_router(invitations_router, prefix="/api", tags=["Invitations"])
 app.include_router(specialized_advice_router, prefix="/api", tags=["Specialized Advice"])
 app.include_router(decision_tree_router, prefix="/api", tags=["Decision Tree"])
 
+@app.on_event("shutdown")
+async def close_openai_clients():
+    """Zamknij współdzielone klienty OpenAI i ich pule połączeń."""
+    await aclose_clients()
+
+@app.on_event("shutdown")
+async def flush_chat_writes():
+    """Zapisz zakolejkowane i zbuforowane zapisy czatu przed zamknięciem procesu."""
+    await asyncio.to_thread(ai_chat_selector.flush_pending_writes)
+
 # Modele danych z walidacją
 class ChatMessage(BaseModel):
     role: str = Field(..., example="user")
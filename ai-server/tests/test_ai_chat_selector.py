@@ -0,0 +1,133 @@
+import sys
+import os
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import ai.ai_chat_selector as chat_selector
+from ai.ai_chat_selector import AIChatSelector
+
+class StubConnection:
+    """Stands in for the pooled connection prepared statements are tracked on."""
+
+class StubCursor:
+    """Records executed statement parameters instead of sending them to Postgres."""
+    def __init__(self, statements, connection):
+        self.statements = statements
+        self.connection = connection
+    
+    def execute(self, sql, params=None):
+        if params:
+            self.statements.append(params)
+
+def _stub_db(monkeypatch):
+    """
+    Replace the selector's DB access with a stub cursor.
+    
+    Returns the recorded statement parameters and the (table, rows) batch inserts.
+    """
+    statements, inserts = [], []
+    connection = StubConnection()
+
+    @contextmanager
+    def stub_cursor(commit=True):
+        yield StubCursor(statements, connection)
+
+    def stub_execute_values(cursor, sql, rows, page_size=None):
+        inserts.append((sql.split()[2], list(rows)))
+
+    monkeypatch.setattr(chat_selector, "get_thread_db_cursor", stub_cursor)
+    monkeypatch.setattr(chat_selector, "execute_values", stub_execute_values)
+    return statements, inserts
+
+def test_flush_pending_writes_drains_queue_in_order(monkeypatch):
+    statements, inserts = _stub_db(monkeypatch)
+    selector = AIChatSelector(None, None, None)
+    done = []
+
+    selector._enqueue_write(done.append, 1)
+    selector._enqueue_write(selector._update_user_advisor, 7, "tax")
+    selector.save_chat_and_decision_data(7, "user_message", "Cześć")
+    selector.save_chat_and_decision_data(7, "decision", {"node_id": "root", "selection": "retirement"})
+    selector._enqueue_write(done.append, 2)
+    selector.flush_pending_writes()
+
+    assert done == [1, 2]
+    assert statements == [("tax", 7)]
+    assert [table for table, _ in inserts] == ["chat_interactions", "decision_interactions"]
+    assert inserts[0][1][0][:3] == (7, "Cześć", None)
+    assert inserts[1][1][0][:3] == (7, "root", "retirement")
+    assert selector._write_q.unfinished_tasks == 0
+
+def test_failed_write_does_not_stop_the_writer(monkeypatch):
+    _stub_db(monkeypatch)
+    selector = AIChatSelector(None, None, None)
+    done = []
+
+    def failing_write():
+        raise RuntimeError("database unavailable")
+
+    selector._enqueue_write(failing_write)
+    selector._enqueue_write(done.append, 1)
+    selector.flush_pending_writes()
+
+    assert done == [1]
+
+def test_failed_flush_keeps_rows_for_next_flush(monkeypatch):
+    _, inserts = _stub_db(monkeypatch)
+    selector = AIChatSelector(None, None, None)
+    selector.flush_pending_writes()
+    failures = []
+
+    def failing_execute_values(cursor, sql, rows, page_size=None):
+        failures.append(sql.split()[2])
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(chat_selector, "execute_values", failing_execute_values)
+    selector.save_chat_and_decision_data(7, "user_message", "Cześć")
+    selector.flush_pending_writes()
+    assert failures == ["chat_interactions"]
+    assert inserts == []
+
+    _, inserts = _stub_db(monkeypatch)
+    selector.save_chat_and_decision_data(8, "user_message", "Hej")
+    selector.flush_pending_writes()
+
+    assert len(inserts) == 1
+    assert [row[:2] for row in inserts[0][1]] == [(7, "Cześć"), (8, "Hej")]
+
+class StubAdvisor:
+    def __init__(self, name):
+        self.name = name
+        self.requests = []
+    
+    def process_advisory_request(self, request):
+        self.requests.append(request)
+        return SimpleNamespace(answer=self.name)
+
+def test_short_messages_use_the_advisor_from_the_cached_profile(monkeypatch):
+    financial, investment = StubAdvisor("financial"), StubAdvisor("investment")
+    selector = AIChatSelector(financial, investment, None)
+    profile = {"financial_data": {}, "behavioral_profile": {}, "recommended_advisor": "investment"}
+    loads, writes, scans = [], [], []
+    monkeypatch.setattr(selector, "_load_profile_from_database", lambda user_id: loads.append(user_id) or profile)
+    monkeypatch.setattr(selector, "_enqueue_write", lambda func, *args: writes.append(func.__name__))
+    monkeypatch.setattr(selector, "check_decision_tree_readiness", lambda *args: scans.append(args) or {})
+    
+    assert selector.handle_message("Cześć", 7, {}) == "investment"
+    assert selector.handle_message("Hej", 7, {}) == "investment"
+    
+    assert loads == [7, 7]
+    assert scans == []
+    assert writes == []
+    assert investment.requests[1].context["recommended_advisor"] == "investment"
+
+def test_caller_context_advisor_is_not_replaced_by_the_profile(monkeypatch):
+    financial, investment = StubAdvisor("financial"), StubAdvisor("investment")
+    selector = AIChatSelector(financial, investment, None)
+    profile = {"financial_data": {}, "behavioral_profile": {}, "recommended_advisor": "investment"}
+    monkeypatch.setattr(selector, "_load_profile_from_database", lambda user_id: profile)
+    monkeypatch.setattr(selector, "_enqueue_write", lambda func, *args: None)
+    selector.handle_message("Cześć", 7, {})
+    
+    assert selector.handle_message("Hej", 7, {"recommended_advisor": "tax"}) == "financial"
@@ -0,0 +1,97 @@
+import sys
+import os
+import json
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import ai.enhanced_model as enhanced_model
+from ai.enhanced_model import EnhancedFinancialModel
+
+FEATURE_NAMES = [
+    "income", "expenses", "assets_value", "current_savings",
+    "debt_to_income", "savings_rate", "expense_to_income"
+]
+
+USERS = {
+    "income": [5000, 2000, 8000],
+    "expenses": [3000, 1900, 2500],
+    "assets_value": [20000, 1000, 150000],
+    "current_savings": [4000, 100, 30000],
+    "total_debt": [1000, 5000, 0],
+    "savings_goal": [10000, 5000, 50000]
+}
+
+def _synthetic_data(n_samples):
+    return EnhancedFinancialModel.__new__(EnhancedFinancialModel).generate_synthetic_data(n_samples=n_samples)
+
+@pytest.fixture(scope="module")
+def model(tmp_path_factory):
+    """Model loaded from a small saved forest, so no hyperparameter search runs."""
+    X, y = _synthetic_data(500)
+    scaler = StandardScaler().fit(X)
+    forest = RandomForestClassifier(n_estimators=40, random_state=42).fit(scaler.transform(X), y)
+    model_path = tmp_path_factory.mktemp("models") / "financial_model.joblib"
+    joblib.dump({"model": forest, "scaler": scaler, "feature_names": FEATURE_NAMES}, model_path)
+    return EnhancedFinancialModel(model_path=str(model_path))
+
+def test_batch_prediction_matches_single_rows(model):
+    results = model.predict_financial_status_batch(USERS)
+    
+    assert len(results) == 3
+    for i, result in enumerate(results):
+        single = model.predict_financial_status({name: values[i] for name, values in USERS.items()})
+        assert result["status"] == single["status"]
+        assert result["confidence"] == pytest.approx(single["confidence"])
+        assert result["probabilities"] == pytest.approx(single["probabilities"])
+
+def test_batch_prediction_is_json_serializable(model):
+    results = model.predict_financial_status_batch(USERS)
+    
+    for result in results:
+        assert type(result["confidence"]) is float
+        assert all(type(p) is float for p in result["probabilities"].values())
+    json.dumps(results)
+
+def test_pruning_keeps_tree_predictions_on_training_set():
+    X, y = _synthetic_data(500)
+    pruned = EnhancedFinancialModel.__new__(EnhancedFinancialModel)
+    pruned.model = RandomForestClassifier(n_estimators=60, random_state=42).fit(X, y)
+    before = {id(est): est.predict(X) for est in pruned.model.estimators_}
+    
+    pruned._prune_forest(X[:200], y[:200])
+    
+    assert len(pruned.model.estimators_) <= 60
+    for est in pruned.model.estimators_:
+        np.testing.assert_array_equal(est.predict(X), before[id(est)])
+
+def test_stale_onnx_export_is_removed_when_skl2onnx_is_missing(model, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "skl2onnx", None)
+    monkeypatch.setattr(model, "onnx_path", str(tmp_path / "financial_model.onnx"))
+    with open(model.onnx_path, "wb") as f:
+        f.write(b"previous model")
+    
+    model._export_onnx()
+    
+    assert not os.path.exists(model.onnx_path)
+
+def test_onnx_export_is_served_only_for_its_own_bundle(model, tmp_path, monkeypatch):
+    onnx_path = tmp_path / "financial_model.onnx"
+    onnx_path.write_bytes(b"exported model")
+    session = SimpleNamespace(get_modelmeta=lambda: SimpleNamespace(custom_metadata_map={"fingerprint": "abc"}))
+    monkeypatch.setattr(enhanced_model, "ort", SimpleNamespace(InferenceSession=lambda path, providers: session))
+    monkeypatch.setattr(model, "onnx_path", str(onnx_path))
+    enhanced_model._load_onnx_session.cache_clear()
+    
+    monkeypatch.setattr(model, "_fingerprint", "abc")
+    assert model._load_onnx() is session
+    monkeypatch.setattr(model, "_fingerprint", "retrained")
+    assert model._load_onnx() is None
+    monkeypatch.setattr(model, "_fingerprint", None)
+    assert model._load_onnx() is None
+    enhanced_model._load_onnx_session.cache_clear()
@@ -0,0 +1,86 @@
+import sys
+import os
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import ai.llm_client as llm_client
+
+MESSAGES = [{"role": "user", "content": "Jak oszczędzać?"}]
+
+class StubCompletions:
+    """Records calls and answers like chat.completions of the OpenAI clients."""
+    def __init__(self, answer=None, fragments=(), error=None):
+        self.answer, self.fragments, self.error = answer, fragments, error
+        self.calls = []
+    
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.error and not self.fragments:
+            raise self.error
+        if kwargs.get("stream"):
+            return self._stream()
+        message = SimpleNamespace(content=self.answer)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+    
+    async def _stream(self):
+        for fragment in self.fragments:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=fragment))])
+        if self.error:
+            raise self.error
+
+class AsyncStubCompletions(StubCompletions):
+    async def create(self, **kwargs):
+        return StubCompletions.create(self, **kwargs)
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    llm_client.flush_cache()
+    yield
+    llm_client.flush_cache()
+
+def _use(monkeypatch, completions):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(llm_client, "get_client", lambda: client)
+    monkeypatch.setattr(llm_client, "get_async_client", lambda: client)
+    return completions
+
+async def _collect(fragments):
+    return [fragment async for fragment in fragments]
+
+def test_complete_caches_the_answer(monkeypatch):
+    completions = _use(monkeypatch, StubCompletions(answer=" Odkładaj 10% dochodu. "))
+    
+    assert llm_client.complete(MESSAGES) == "Odkładaj 10% dochodu."
+    assert llm_client.complete(MESSAGES) == "Odkładaj 10% dochodu."
+    assert len(completions.calls) == 1
+    assert completions.calls[0]["messages"] == MESSAGES
+
+def test_complete_returns_none_when_the_call_fails(monkeypatch):
+    _use(monkeypatch, StubCompletions(error=RuntimeError("timeout")))
+    
+    assert llm_client.complete(MESSAGES) is None
+    assert asyncio.run(_collect(llm_client.astream_complete(MESSAGES, "fallback"))) == ["fallback"]
+
+def test_acomplete_shares_the_cache_with_complete(monkeypatch):
+    completions = _use(monkeypatch, AsyncStubCompletions(answer="Fundusz awaryjny"))
+    
+    assert asyncio.run(llm_client.acomplete(MESSAGES)) == "Fundusz awaryjny"
+    assert llm_client.complete(MESSAGES) == "Fundusz awaryjny"
+    assert len(completions.calls) == 1
+
+def test_stream_caches_the_joined_answer(monkeypatch):
+    completions = _use(monkeypatch, AsyncStubCompletions(fragments=["Fundusz ", "awaryjny"]))
+    
+    assert asyncio.run(_collect(llm_client.astream_complete(MESSAGES, "fallback"))) == ["Fundusz ", "awaryjny"]
+    assert asyncio.run(_collect(llm_client.astream_complete(MESSAGES, "fallback"))) == ["Fundusz awaryjny"]
+    assert completions.calls[0]["stream"] is True
+    assert len(completions.calls) == 1
+
+def test_interrupted_stream_is_not_cached(monkeypatch):
+    _use(monkeypatch, AsyncStubCompletions(fragments=["Fundusz "], error=RuntimeError("reset")))
+    
+    assert asyncio.run(_collect(llm_client.astream_complete(MESSAGES, "fallback"))) == ["Fundusz "]
+    assert llm_client.get_cached_answer(llm_client.cache_key(MESSAGES)) is None
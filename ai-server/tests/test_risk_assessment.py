@@ -0,0 +1,66 @@
+import sys
+import os
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ai.risk_assessment import RiskAssessmentService
+from core.financial_models import RiskLevel
+
+@pytest.fixture
+def service():
+    return RiskAssessmentService()
+
+@pytest.mark.parametrize("score, level", [
+    (0, RiskLevel.VERY_LOW),
+    (19.999, RiskLevel.VERY_LOW),
+    (20, RiskLevel.LOW),
+    (59.5, RiskLevel.MEDIUM),
+    (79.99, RiskLevel.HIGH),
+    (80, RiskLevel.VERY_HIGH),
+    (-5, RiskLevel.VERY_LOW),
+    (105, RiskLevel.VERY_HIGH),
+    (math.nan, RiskLevel.VERY_HIGH),
+    (math.inf, RiskLevel.VERY_HIGH),
+    (-math.inf, RiskLevel.VERY_LOW)
+])
+def test_map_to_risk_level(service, score, level):
+    assert service.map_to_risk_level(score) == level
+
+def test_map_to_risk_levels_matches_single_scores(service):
+    scores = np.concatenate([np.linspace(-5, 105, 2001), [np.nan, np.inf, -np.inf]])
+    assert service.map_to_risk_levels(scores) == [service.map_to_risk_level(s) for s in scores]
+
+USERS = [
+    {"income_history": [4000, 4200, 4100], "total_debt": 20000, "annual_income": 60000,
+     "current_savings": 15000, "monthly_expenses": 3000, "investment_horizon": 10, "age": 35},
+    {"income_history": [1000, 5000, 200], "total_debt": 90000, "annual_income": 30000,
+     "current_savings": 500, "monthly_expenses": 2500, "investment_horizon": 2, "age": 62},
+    {"income_history": [3000], "total_debt": 0, "annual_income": 0,
+     "current_savings": 0, "monthly_expenses": 0, "investment_horizon": None, "age": None}
+]
+
+def test_batch_scores_match_single_user_scores(service):
+    result = service.calculate_risk_scores_batch(pd.DataFrame(USERS), save=False)
+    
+    for user, (_, row) in zip(USERS, result.iterrows()):
+        # Missing inputs are NaN in the batch and absent keys for a single user
+        single = service.calculate_risk_score({key: value for key, value in user.items() if value is not None})
+        assert row["risk_score"] == pytest.approx(single["risk_score"])
+        assert row["risk_level"] == single["risk_level"]
+        for factor, score in single["factor_scores"].items():
+            assert row[factor] == pytest.approx(score)
+
+def test_batch_scores_are_saved_in_one_bulk_call(service, monkeypatch):
+    saved = []
+    monkeypatch.setattr(service, "save_risk_assessments_bulk", saved.append)
+    users = pd.DataFrame(USERS).assign(user_id=[11, 12, 13])
+    
+    result = service.calculate_risk_scores_batch(users)
+    
+    assert len(saved) == 1
+    assert [entry[0] for entry in saved[0]] == [11, 12, 13]
+    assert [entry[2] for entry in saved[0]] == result["risk_level"].tolist()
@@ -0,0 +1,105 @@
+import sys
+import os
+
+import pytest
+from pydantic import ValidationError
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ai.tree_model import FinancialDecisionTree, DecisionTreeRequest, DecisionTreeResponse, FinancialRecommendation, TreeModel, _INTENT_RESPONSES
+
+@pytest.fixture(scope="module")
+def tree():
+    return FinancialDecisionTree()
+
+def _step(tree, context, node_id=None, answer=None):
+    """Run one step; returns the response and the (validated copy of the) updated context."""
+    request = DecisionTreeRequest(user_id=1, current_node_id=node_id, answer=answer, context=context)
+    return tree.process_step(request), request.context
+
+def test_legacy_journey_is_converted_to_step_counter(tree):
+    _, current = _step(tree, {})
+    
+    expected, current = _step(tree, current, "root", "retirement")
+    response, legacy = _step(tree, {"journey": ["root"], "answers": {}}, "root", "retirement")
+    
+    assert "journey" not in legacy
+    assert response.node.id == expected.node.id
+    assert response.progress == expected.progress
+    assert legacy == current
+
+def test_legacy_journey_marks_only_known_nodes(tree):
+    journey = ["root", tree._node_index["retirement_age"], "unknown_node", -1, 10**8, True]
+    
+    _, context = _step(tree, {"journey": journey, "answers": {"root": "retirement"}}, "retirement_age")
+    
+    assert context["step"] == 6
+    assert context["visited_mask"] == (1 << tree._root_idx) | (1 << tree._node_index["retirement_age"])
+
+def test_session_counts_steps_and_marks_visited_nodes(tree):
+    path = [("root", "emergency_fund"), ("ef_timeframe", "short"), ("ef_amount", "six"), ("ef_savings_method", "automatic")]
+    response, context = _step(tree, {})
+    assert response.node.id == "root"
+    assert context["step"] == 1
+    
+    for step, (node_id, answer) in enumerate(path, start=2):
+        response, context = _step(tree, context, node_id, answer)
+        assert context["step"] == step
+        assert context["visited_mask"] >> tree._node_index[response.node.id] & 1
+        assert response.progress == min(1.0, step / 4)
+    
+    assert response.node.id == "ef_recommendation"
+    assert response.recommendations
+    assert bin(context["visited_mask"]).count("1") == len(path) + 1
+    assert context["answers"] == dict(path)
+
+def test_unknown_answer_stays_on_node_without_counting_a_step(tree):
+    _, context = _step(tree, {})
+    
+    response, context = _step(tree, context, "root", "not_an_option")
+    
+    assert response.node.id == "root"
+    assert context["step"] == 1
+
+def test_request_and_response_models_are_frozen(tree):
+    request = DecisionTreeRequest(user_id=1)
+    response, _ = _step(tree, {})
+    
+    with pytest.raises(ValidationError):
+        request.answer = "retirement"
+    with pytest.raises(ValidationError):
+        response.progress = 1.0
+
+def test_models_reject_unknown_fields():
+    with pytest.raises(ValidationError):
+        DecisionTreeRequest(user_id=1, node_id="root")
+    with pytest.raises(ValidationError):
+        FinancialRecommendation(id="r", title="t", description="d", advisor_type="financial", impact="high", extra="x")
+
+def test_fresh_sessions_share_the_root_response(tree):
+    first, first_context = _step(tree, {})
+    second, second_context = _step(tree, {})
+    
+    assert first is second
+    assert first.model_dump() == DecisionTreeResponse(node=tree.tree["root"].to_model(), progress=0.25).model_dump()
+    assert first_context == second_context == {"answers": {}, "step": 1, "visited_mask": 1 << tree._root_idx}
+
+def test_recommendation_payload_is_dumped_once(tree):
+    response, _ = _step(tree, {"answers": {"root": "emergency_fund"}, "step": 4}, "ef_savings_method", "automatic")
+    
+    recommendation = response.recommendations[0]
+    assert recommendation.response_payload is recommendation.response_payload
+    assert recommendation.response_payload == recommendation.model_dump()
+
+@pytest.mark.parametrize("message, intent", [
+    ("Chcę spłacić kredyt i kupić dom", "debt_reduction"),
+    ("Wakacje czy fundusz awaryjny?", "emergency_fund"),
+    ("Nieruchomość na emeryturę", "home_purchase"),
+    ("Ile kosztują studia?", "education"),
+])
+def test_tree_model_predicts_the_first_matching_intent(message, intent):
+    response = TreeModel().predict_response(message)
+    
+    assert response == _INTENT_RESPONSES[intent]
+
+def test_tree_model_answers_unknown_messages_with_the_goal_menu():
+    assert TreeModel().predict_response("Dzień dobry").startswith("Czym mogę Ci pomóc?")